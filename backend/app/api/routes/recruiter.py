@@ -1,13 +1,19 @@
 import re
+import threading
+from uuid import uuid4
 
 from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
 
+from app.core.app_logging import recruiter_logger
 from app.core.auth import CurrentUser, get_current_user
+from app.core.bm25_index import drop_batch_corpus
+from app.core.vector_store import delete_batch
 from app.db import crud
 from app.db.session import get_db_session
 from app.models.schemas import CandidateStatus, JobStatusResponse, RecruiterAnalysisResponse, StageStatus
 from app.services import job_store
+from app.services.document_index import release_batch_documents
 from app.services.document_loader import load_document
 from app.services.email_service import EmailNotConfiguredError, send_email
 from app.services.job_store import JobState, StepState
@@ -34,6 +40,29 @@ def _persist_candidates(project_id: str | None, result: RecruiterAnalysisRespons
         db.close()
 
 
+def _drop_batch_on_terminal(job: job_store.Job) -> None:
+    """A finished recruiter job's chunks are never read again -- drop its
+    whole batch with one filter-based delete instead of leaving it to pile
+    up in the vector store. Runs on a short-lived thread: terminal
+    transitions happen on the event loop, and this is network I/O."""
+    if job.kind != "recruiter" or not job.batch_id:
+        return
+
+    def drop() -> None:
+        try:
+            release_batch_documents(job.batch_id)
+            drop_batch_corpus(job.batch_id)
+            delete_batch(job.batch_id)
+        except Exception:
+            # Best-effort -- the TTL sweep picks up anything missed here.
+            recruiter_logger.exception("Failed to drop batch %s", job.batch_id)
+
+    threading.Thread(target=drop, name=f"drop-batch-{job.batch_id[:8]}", daemon=True).start()
+
+
+job_store.add_terminal_listener(_drop_batch_on_terminal)
+
+
 def _candidate_callback(job_id: str):
     def on_candidate(filename: str, state: str, score: float | None, phase: str) -> None:
         job_store.update_candidate(job_id, filename, StepState(state), score, phase)
@@ -49,10 +78,17 @@ async def _run_round1_job(
     job_id: str, jd_text: str, job_role: str, resumes: list[tuple[str, bytes]], num_vacancies: int | None
 ) -> None:
     job_store.set_running(job_id)
-    project_id = job_store.get_job(job_id).project_id
+    job = job_store.get_job(job_id)
+    project_id = job.project_id
     try:
         state, summary = await run_round1(
-            jd_text, job_role, resumes, num_vacancies, _candidate_callback(job_id), _stop_check(job_id)
+            jd_text,
+            job_role,
+            resumes,
+            num_vacancies,
+            _candidate_callback(job_id),
+            _stop_check(job_id),
+            batch_id=job.batch_id,
         )
         if job_store.is_stop_requested(job_id):
             result = finalize_stopped_after_round1(state)
@@ -224,7 +260,9 @@ async def create_job(
     resume_payload = [(r.filename or "", await r.read()) for r in resumes]
     candidate_names = [name for name, _ in resume_payload]
 
-    job = job_store.create_job("recruiter", candidate_names=candidate_names, project_id=project_id)
+    job = job_store.create_job(
+        "recruiter", candidate_names=candidate_names, project_id=project_id, batch_id=str(uuid4())
+    )
     background_tasks.add_task(
         _run_round1_job, job.id, project.job_desc_text, project.job_role, resume_payload, project.num_vacancies
     )
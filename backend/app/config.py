@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # .env lives at the project root (one level above backend/), shared with the
@@ -9,10 +10,27 @@ _ROOT_ENV = Path(__file__).resolve().parent.parent.parent / ".env"
 
 class Settings(BaseSettings):
     groq_api_key: str
-    qdrant_url: str
-    qdrant_api_key: str
+    qdrant_url: str = ""
+    qdrant_api_key: str = ""
     gemini_api_key: str = ""
 
+    # Where resume chunks + vectors are stored (see app/core/vector_store.py).
+    # "qdrant" is the durable, networked default; "local" keeps per-document
+    # chunk matrices in-process (app/core/local_vector_store.py), so a
+    # single-node deployment or a test run needs no Qdrant server -- with
+    # local_vector_store_dir set, documents persist to .npy + SQLite files
+    # there; empty keeps them memory-only.
+    vector_store_backend: str = "qdrant"
+    local_vector_store_dir: str = ""
+    # Bulk writes/reads: points per Qdrant upsert request, and per scroll page.
+    vector_store_upsert_batch_size: int = 256
+    vector_store_scroll_page_size: int = 1000
+    # Recruiter batches are deleted as soon as their job finishes; anything
+    # older than this that no live job still references (orphaned by a crash
+    # or restart mid-job) is swept every vector_batch_sweep_interval_seconds.
+    vector_batch_ttl_hours: float = 24.0
+    vector_batch_sweep_interval_seconds: float = 3600.0
+
     # llama-3.3-70b-versatile hit its 100k/day free-tier token quota during
     # testing. Groq's quotas are per-model, so llama-3.1-8b-instant gives us
     # an untouched budget -- also smaller/faster, matching the "personal
@@ -47,22 +65,78 @@ class Settings(BaseSettings):
     rubric_gemini_model: str = "gemini-3.1-flash-lite"
     rubric_check_fallback_model: str = "llama-3.1-8b-instant"
 
+    # The three tiers have independent quotas, so a rubric's batches run
+    # concurrently, each dispatched to whichever tier has capacity right now
+    # (see _run_rubric_batches). Per-provider admission limits, shared
+    # process-wide (app/core/rate_limit.py): calls in flight, and the default
+    # requests-per-minute budget for models without their own entry in
+    # rate_limit.MODEL_LIMITS (free-tier RPM: Gemini Flash Lite 15, Groq 8B 30).
+    rubric_max_parallel_batches: int = 6
+    ollama_max_concurrency: int = 3
+    ollama_requests_per_minute: float = 20.0
+    gemini_max_concurrency: int = 2
+    gemini_requests_per_minute: float = 15.0
+    groq_max_concurrency: int = 1
+    groq_requests_per_minute: float = 30.0
+
+    # Exact prompt-token counting (app/core/tokenizers.py): each model
+    # family's tokenizer is fetched from the Hugging Face hub on first use,
+    # in the background -- calls budget with the chars/token heuristic (and
+    # its 30% safety margin) until it's ready, or for good if it can't load
+    # (offline, gated repo). False never downloads anything.
+    exact_token_counting: bool = True
+
     embedding_model: str = "Alibaba-NLP/gte-base-en-v1.5"
     reranker_model: str = "cross-encoder/ms-marco-electra-base"
 
-    # Groq's free tier caps llama-3.3-70b-versatile at 12,000 TPM. Running
-    # candidates concurrently means several large rubric-scoring prompts
-    # compete for that same rolling budget and collide. Instead we process
-    # candidates fully sequentially and pace each Groq call to roughly one
-    # per minute, so every call sees a close-to-fresh TPM window.
-    recruiter_concurrency: int = 1
-    recruiter_call_interval_seconds: float = 60.0
+    # Content-addressed embedding cache in front of embed_texts (see
+    # app/core/embedding_cache.py). The memory tier is an LRU bounded by
+    # entry count -- 20k gte-base vectors is ~60 MB of float32. Empty
+    # embedding_cache_dir keeps it memory-only; set it to persist vectors to
+    # a memory-mapped on-disk tier that survives restarts.
+    embedding_cache_max_entries: int = 20_000
+    embedding_cache_dir: str = ""
+    embedding_cache_disk_max_entries: int = 500_000
+    # Content-addressed index of whole chunked + embedded documents (see
+    # app/services/document_index.py), so re-analyzing a resume skips
+    # chunking and embedding entirely. A resume is a few dozen chunks (~100
+    # KB of vectors), so 1,000 documents is ~100 MB. Documents referenced by
+    # a live batch are never evicted.
+    document_index_max_entries: int = 1_000
+
+    # Micro-batching on the single GPU worker thread (see app/core/gpu_lock.py):
+    # concurrent embed/rerank requests arriving within this window are merged
+    # into one forward pass per model, up to gpu_batch_max_items items. A few
+    # milliseconds of added latency per call buys one padded batch instead of
+    # several tiny ones when round 1/2/3 candidate threads overlap.
+    gpu_batch_window_ms: float = 5.0
+    gpu_batch_max_items: int = 256
+
+    # Round-3 candidates verified at once. Every LLM call -- whichever
+    # candidate it's for -- is admitted through the shared per-model
+    # RPM/TPM/RPD budgets in app/core/rate_limit.py, which start each call as
+    # soon as its quota allows, so this only bounds in-flight work; it no
+    # longer needs to serialize candidates to protect Groq's TPM window. A
+    # candidate waiting on its LLM calls is a suspended coroutine on the LLM
+    # loop (app/core/llm_loop.py), not a parked thread, so this can sit well
+    # above the thread pool's size.
+    recruiter_concurrency: int = 8
 
     # RAG chunking / retrieval tuning
     chunk_size: int = 400
     chunk_overlap: int = 60
     rrf_k: int = 60  # reciprocal-rank-fusion smoothing constant
     fusion_candidate_k: int = 10  # candidates kept after BM25+dense fusion, before rerank
+    # Skip the cross-encoder per requirement when it can't change the outcome:
+    # a fused candidate names the requirement verbatim (or by alias), there
+    # are no more candidates than evidence slots, or -- if this margin is set
+    # above 0 -- fused rank 1 leads rank evidence_top_k by at least this much
+    # (RRF scores top out around 2/(rrf_k+1), so useful margins are small).
+    adaptive_rerank: bool = True
+    rerank_skip_fused_margin: float = 0.0
+    # Final evidence lists per (document content hash, requirement, retrieval
+    # settings) -- a few short snippets each, so entries are cheap.
+    evidence_cache_max_entries: int = 50_000
 
     # A single rubric call covering every JD requirement can exceed smaller
     # models' per-request TPM ceiling (e.g. llama-3.1-8b-instant caps at
@@ -84,6 +158,32 @@ class Settings(BaseSettings):
     rubric_batch_size: int = 3
     recruiter_rubric_batch_size: int = 3
     recruiter_evidence_top_k: int = 4
+    # Adaptive batching (app/services/rubric_batcher.py): the sizes above are
+    # each tier's *starting* requirements-per-batch limit. It then adapts per
+    # provider/model -- separately for each starting size, so job-seeker and
+    # recruiter rubrics never share one -- within rubric_batch_max_size: up
+    # after batches that come back complete, down sharply when
+    # `_reconcile_batch_verdicts` has to backfill a dropped requirement.
+    # Batches are also packed by evidence size
+    # (rubric_batch_max_prompt_tokens of requirement sections), and two
+    # requirements whose embeddings are at least rubric_duplicate_similarity
+    # alike never share a batch -- the Power BI / Tableau cross-attribution
+    # above. False restores fixed-size, JD-order batches.
+    adaptive_rubric_batching: bool = True
+    rubric_batch_max_size: int = 6
+    rubric_batch_max_prompt_tokens: int = 1800
+    rubric_duplicate_similarity: float = 0.8
+    # Start certification suggestions per rubric batch, as each batch comes
+    # back with unsatisfied requirements, instead of one call after the last
+    # batch -- the suggestions overlap the remaining scoring rather than add
+    # a full LLM round trip to the end of every rubric. Costs one small
+    # request per unsatisfied batch instead of one per rubric; False restores
+    # the single trailing call.
+    stream_certification_suggestions: bool = True
+    # Persist rubric verdicts per (requirement, weight, evidence, model) in
+    # the rubric_verdict_cache table, so identical questions -- retries,
+    # stop-and-resume, duplicate uploads -- never spend another LLM call.
+    rubric_verdict_cache_enabled: bool = True
 
     # Three-round recruiter screening funnel, mirroring a real ATS pipeline
     # (bulk screen -> phone screen -> onsite) instead of spending equal LLM
@@ -105,15 +205,19 @@ class Settings(BaseSettings):
     recruiter_round1_shortlist_multiplier: float = 6.0  # shortlist = vacancies * this
     recruiter_round1_shortlist_min: int = 3
     recruiter_prescreen_concurrency: int = 5  # round 1 is local-only, no Groq/pacing needed
+    # Share of round 1's score from batch-IDF BM25 (see
+    # score_candidates_lexically) -- the rest stays dense cosine. 0 disables.
+    round1_lexical_weight: float = 0.25
 
     recruiter_round2_shortlist_percent: float = 0.05  # used when vacancies isn't given
     recruiter_round2_shortlist_multiplier: float = 3.0  # shortlist = vacancies * this
     recruiter_round2_shortlist_min: int = 2
     # Round 2's calls are single, light skill-extraction requests (no
     # evidence citation, no batching) -- much smaller than round 3's rubric
-    # calls, so moderate concurrency is safe with call_structured's existing
-    # 429 backoff as the safety net, rather than round 3's strict 60s pacing.
-    recruiter_round2_concurrency: int = 3
+    # calls, so moderate concurrency is safe -- admission is budgeted by the
+    # shared rate limiter either way, with call_structured's 429 backoff as
+    # the safety net, and each call in flight holds no thread.
+    recruiter_round2_concurrency: int = 16
 
     # Individual recruiter-to-candidate emails (interview invites, rejections,
     # etc.) -- one SMTP account configured for the whole app, not per-recruiter
@@ -138,5 +242,16 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def _require_qdrant_credentials(self) -> "Settings":
+        # qdrant_url/qdrant_api_key only default to "" so the local backend
+        # can run without them -- the Qdrant backend still fails at startup,
+        # not on its first request, when either is missing.
+        if self.vector_store_backend == "qdrant":
+            missing = [name for name in ("qdrant_url", "qdrant_api_key") if not getattr(self, name)]
+            if missing:
+                raise ValueError(f"vector_store_backend='qdrant' requires {', '.join(missing)}")
+        return self
+
 
 settings = Settings()
@@ -27,7 +27,8 @@ recruiter_logger = _make_logger("recruiter", "recruiter.log")
 # requirements -> retrieve_evidence -> evaluate_rubric -> _evaluate_rubric_
 # batch -> _suggest_certifications), each pipeline sets this contextvar once
 # at its entry point; asyncio.to_thread propagates the current context into
-# the worker thread, so deep shared functions just call get_logger() and
+# the worker thread (and app/core/llm_loop.py into every coroutine it runs
+# on the LLM loop), so deep shared functions just call get_logger() and
 # automatically write to whichever pipeline's file is actually running --
 # no signature changes needed anywhere in the RAG pipeline itself.
 _current_logger: contextvars.ContextVar[logging.Logger] = contextvars.ContextVar(
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy import sparse
+
+# rank_bm25.BM25Okapi's defaults -- scores here match it exactly for the same
+# corpus, so swapping it out didn't shift any fusion ranking.
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def term_id(token: str) -> int:
+    """Stable 63-bit term ID (identical across processes and restarts, unlike
+    hash()), so term IDs stored alongside chunks stay valid forever."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+
+def sparse_terms(text: str) -> dict:
+    """A chunk's precomputed lexical form, stored in its payload at index
+    time: parallel term_ids/term_freqs lists plus its token count (BM25's
+    document length)."""
+    counts: dict[int, int] = {}
+    tokens = tokenize(text)
+    for token in tokens:
+        tid = term_id(token)
+        counts[tid] = counts.get(tid, 0) + 1
+    return {"term_ids": list(counts), "term_freqs": list(counts.values()), "token_count": len(tokens)}
+
+
+def chunk_terms(chunk: dict) -> dict:
+    """A fetched chunk's stored sparse terms, or -- for chunks indexed before
+    term IDs were stored -- the same thing computed from its text."""
+    if "term_ids" in chunk:
+        return chunk
+    return sparse_terms(chunk["text"])
+
+
+@dataclass
+class CorpusStats:
+    """Document frequencies over the corpus BM25's IDF is computed against.
+    Built from one document's own chunks by default; a caller can pass a
+    wider corpus instead."""
+
+    doc_count: int = 0
+    total_tokens: int = 0
+    doc_freqs: dict[int, int] = field(default_factory=dict)
+    _idf_floor: float | None = field(default=None, repr=False)
+
+    def add(self, terms: list[dict]) -> None:
+        for t in terms:
+            self.doc_count += 1
+            self.total_tokens += t["token_count"]
+            for tid in t["term_ids"]:
+                self.doc_freqs[tid] = self.doc_freqs.get(tid, 0) + 1
+        self._idf_floor = None
+
+    @classmethod
+    def from_terms(cls, terms: list[dict]) -> "CorpusStats":
+        stats = cls()
+        stats.add(terms)
+        return stats
+
+    @property
+    def avg_doc_len(self) -> float:
+        return self.total_tokens / self.doc_count if self.doc_count else 0.0
+
+    def idf(self, term_ids: list[int]) -> np.ndarray:
+        """BM25Okapi's IDF: log((N - n + 0.5) / (n + 0.5)), with negative
+        values (terms in over half the corpus) floored at epsilon times the
+        corpus-wide average IDF. Terms absent from the corpus get 0 -- they
+        contribute nothing, exactly like BM25Okapi's `idf.get(q, 0)`."""
+        if not self.doc_count or not self.doc_freqs:
+            return np.zeros(len(term_ids))
+        n = self.doc_count
+        if self._idf_floor is None:
+            # O(vocabulary) -- computed once per corpus state, not per call,
+            # since a batch-wide corpus is scored against many times.
+            idf_sum = sum(math.log(n - df + 0.5) - math.log(df + 0.5) for df in self.doc_freqs.values())
+            self._idf_floor = BM25_EPSILON * idf_sum / len(self.doc_freqs)
+        floor = self._idf_floor
+        out = np.zeros(len(term_ids))
+        for i, tid in enumerate(term_ids):
+            df = self.doc_freqs.get(tid)
+            if df is None:
+                continue
+            value = math.log(n - df + 0.5) - math.log(df + 0.5)
+            out[i] = floor if value < 0 else value
+        return out
+
+
+# Batch-wide corpora: one resume's handful of chunks is too small a corpus
+# for a meaningful IDF (a skill mentioned in most of a resume's own chunks
+# gets penalized, which is backwards for a presence signal). Each recruiter
+# batch instead accumulates document frequencies over every chunk of every
+# candidate as `index_documents` runs, and per-candidate BM25 scores against
+# that. All additions happen during round 1's indexing, before any scoring
+# reads the corpus, so readers don't take the lock.
+_batch_corpora: dict[str, tuple[CorpusStats, set[str]]] = {}
+_batch_corpora_lock = threading.Lock()
+
+
+def add_to_batch_corpus(batch_id: str, documents: dict[str, list[dict]]) -> None:
+    """Adds each document's chunk terms to `batch_id`'s corpus. A filename
+    already counted is skipped, so re-indexing can't double its weight."""
+    with _batch_corpora_lock:
+        corpus, seen = _batch_corpora.setdefault(batch_id, (CorpusStats(), set()))
+        for filename, terms in documents.items():
+            if filename not in seen:
+                seen.add(filename)
+                corpus.add(terms)
+
+
+def batch_corpus(batch_id: str) -> CorpusStats | None:
+    with _batch_corpora_lock:
+        entry = _batch_corpora.get(batch_id)
+    return entry[0] if entry else None
+
+
+def drop_batch_corpus(batch_id: str) -> None:
+    with _batch_corpora_lock:
+        _batch_corpora.pop(batch_id, None)
+
+
+def bm25_scores(queries: list[str], terms: list[dict], corpus: CorpusStats | None = None) -> np.ndarray:
+    """(queries x chunks) BM25 scores as ONE sparse matrix product.
+
+    Chunks become a CSR matrix of saturated, IDF-weighted term frequencies
+    over their own (document-local) vocabulary; queries become a CSR matrix
+    of term counts over that same vocabulary (a repeated query term counts
+    twice, as in BM25Okapi). Their product is every query's score against
+    every chunk -- no per-query Python loop over chunks.
+    """
+    scores = np.zeros((len(queries), len(terms)))
+    if not queries or not terms:
+        return scores
+    corpus = corpus if corpus is not None else CorpusStats.from_terms(terms)
+    avg_doc_len = corpus.avg_doc_len or 1.0
+
+    column: dict[int, int] = {}
+    rows, cols, tfs, lengths = [], [], [], []
+    for row, t in enumerate(terms):
+        for tid, tf in zip(t["term_ids"], t["term_freqs"]):
+            rows.append(row)
+            cols.append(column.setdefault(tid, len(column)))
+            tfs.append(tf)
+            lengths.append(t["token_count"])
+    if not column:
+        return scores
+
+    tfs = np.asarray(tfs, dtype=np.float64)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(lengths, dtype=np.float64) / avg_doc_len)
+    idf = corpus.idf(list(column))
+    weights = idf[cols] * tfs * (BM25_K1 + 1) / (tfs + norm)
+    chunk_matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(len(terms), len(column)))
+
+    q_rows, q_cols = [], []
+    for row, query in enumerate(queries):
+        for token in tokenize(query):
+            col = column.get(term_id(token))
+            if col is not None:
+                q_rows.append(row)
+                q_cols.append(col)
+    # Duplicate (row, col) entries are summed on construction -> term counts.
+    query_matrix = sparse.csr_matrix(
+        (np.ones(len(q_rows)), (q_rows, q_cols)), shape=(len(queries), len(column))
+    )
+    return (query_matrix @ chunk_matrix.T).toarray()
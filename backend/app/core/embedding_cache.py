@@ -0,0 +1,204 @@
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from app.core.cache import LRUCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks -- single-worker dev setups only
+    fcntl = None
+
+
+def embedding_cache_key(model_name: str, text: str) -> str:
+    """Content address for one embedding: the same text under a different
+    model is a different vector, so the model name is part of the key."""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """Append-only, memory-mapped float32 store for one embedding model.
+
+    Two files per model directory: `vectors.f32` (raw row-major float32
+    rows) and `keys.txt` (one hex key per line, same row order), so key N
+    always names row N. Vectors are written before their keys, which means a
+    crash mid-write leaves at worst a torn last key line and/or vector bytes
+    no key refers to. `_sync` cuts both back to the last complete row before
+    anything is appended -- otherwise the next append would land after the
+    torn bytes while its keys were numbered from the row count, pointing
+    every later key at the wrong vector.
+
+    Several processes (uvicorn workers) may share one directory: every
+    append happens under an exclusive lock on its `lock` file, after
+    catching up with whatever rows the other processes appended since.
+    Once `max_entries` is reached new vectors simply stop being persisted;
+    the memory tier still serves them for the life of the process.
+    """
+
+    def __init__(self, directory: Path, max_entries: int):
+        directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = directory / "vectors.f32"
+        self._keys_path = directory / "keys.txt"
+        self._meta_path = directory / "meta.json"
+        self._lock_path = directory / "lock"
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._dim: int | None = None
+        self._rows: dict[str, int] = {}
+        self._row_count = 0
+        self._keys_bytes = 0  # prefix of keys.txt already loaded into _rows
+        self._mapped: np.memmap | None = None
+        with self._lock, self._file_lock():
+            self._sync()
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Loads keys appended since the last sync (by this or another
+        process) and truncates a torn tail. Caller holds both locks."""
+        if self._dim is None and self._meta_path.exists():
+            self._dim = json.loads(self._meta_path.read_text(encoding="utf-8"))["dim"]
+        if self._dim is None or not self._keys_path.exists():
+            return
+        row_bytes = self._dim * 4
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_bytes)
+            tail = f.read()
+        # Only newline-terminated lines are keys; a partial last line is a
+        # crash mid-append and is dropped.
+        lines = tail[: tail.rfind(b"\n") + 1].split(b"\n")[:-1]
+        vector_rows = self._vectors_path.stat().st_size // row_bytes if self._vectors_path.exists() else 0
+        # A key whose vector bytes are missing can't be served either.
+        lines = lines[: max(0, vector_rows - self._row_count)]
+        for line in lines:
+            self._rows.setdefault(line.decode("utf-8"), self._row_count)
+            self._row_count += 1
+        self._keys_bytes += sum(len(line) + 1 for line in lines)
+
+        if self._keys_path.stat().st_size > self._keys_bytes:
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(self._keys_bytes)
+        if self._vectors_path.exists() and self._vectors_path.stat().st_size > self._row_count * row_bytes:
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(self._row_count * row_bytes)
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def _view(self) -> np.memmap | None:
+        # Re-map only when rows were appended since the last mapping; reads
+        # in between share one mapping instead of re-opening the file.
+        if not self._row_count or self._dim is None:
+            return None
+        if self._mapped is None or self._mapped.shape[0] < self._row_count:
+            self._mapped = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(self._row_count, self._dim)
+            )
+        return self._mapped
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            view = self._view()
+            return None if view is None else np.array(view[row])
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        with self._lock, self._file_lock():
+            self._sync()
+            fresh = [(k, v) for k, v in zip(keys, vectors) if k not in self._rows]
+            fresh = fresh[: max(0, self._max_entries - self._row_count)]
+            if not fresh:
+                return
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._meta_path.write_text(json.dumps({"dim": self._dim}), encoding="utf-8")
+            block = np.ascontiguousarray(np.stack([v for _, v in fresh]), dtype=np.float32)
+            with open(self._vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            key_lines = "".join(f"{k}\n" for k, _ in fresh).encode("utf-8")
+            with open(self._keys_path, "ab") as f:
+                f.write(key_lines)
+            for key, _ in fresh:
+                self._rows[key] = self._row_count
+                self._row_count += 1
+            self._keys_bytes += len(key_lines)
+
+
+class EmbeddingCache:
+    """Hash-keyed embedding cache: a bounded in-memory LRU tier, optionally
+    backed by an on-disk memory-mapped tier that survives restarts.
+
+    Lookups try memory first, then disk (promoting disk hits into memory);
+    anything found in neither counts as a miss and has to be encoded.
+    """
+
+    def __init__(self, model_name: str, max_entries: int, disk_dir: str = "", disk_max_entries: int = 0):
+        self.model_name = model_name
+        self._memory: LRUCache[str, np.ndarray] = LRUCache(max_entries)
+        self._disk: _DiskTier | None = None
+        if disk_dir:
+            safe_model = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+            self._disk = _DiskTier(Path(disk_dir) / safe_model, disk_max_entries)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+
+    def key(self, text: str) -> str:
+        return embedding_cache_key(self.model_name, text)
+
+    def get_many(self, keys: list[str]) -> list[np.ndarray | None]:
+        found: list[np.ndarray | None] = []
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is None and self._disk is not None:
+                vector = self._disk.get(key)
+                if vector is not None:
+                    vector.setflags(write=False)
+                    self._memory.put(key, vector)
+                    with self._lock:
+                        self.disk_hits += 1
+            found.append(vector)
+        return found
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for key, vector in zip(keys, vectors):
+            # Cached rows are shared between callers -- freeze them so one
+            # caller can't mutate another's embedding in place.
+            row = vector.copy()
+            row.setflags(write=False)
+            self._memory.put(key, row)
+        if self._disk is not None:
+            self._disk.put_many(keys, vectors)
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        with self._lock:
+            disk_hits = self.disk_hits
+        return {
+            "model": self.model_name,
+            # A disk hit first registers as a memory-tier miss -- report it
+            # only once, as a hit.
+            "hits": memory["hits"] + disk_hits,
+            "misses": memory["misses"] - disk_hits,
+            "memory_hits": memory["hits"],
+            "disk_hits": disk_hits,
+            "entries": memory["entries"],
+            "max_entries": memory["max_entries"],
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+        }
@@ -4,7 +4,8 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from app.config import settings
-from app.core.gpu_lock import run_on_gpu_thread
+from app.core.embedding_cache import EmbeddingCache
+from app.core.gpu_lock import run_batched_on_gpu_thread
 
 
 @lru_cache
@@ -16,13 +17,55 @@ def get_embedding_model() -> SentenceTransformer:
     return SentenceTransformer(settings.embedding_model, trust_remote_code=True)
 
 
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache:
+    # One recruiter batch embeds the same JD requirement strings once per
+    # candidate per round, and job seekers re-run the same resume against
+    # many JDs -- a content-addressed cache turns every repeat into a dict
+    # lookup instead of another forward pass on the single GPU worker.
+    return EmbeddingCache(
+        settings.embedding_model,
+        settings.embedding_cache_max_entries,
+        disk_dir=settings.embedding_cache_dir,
+        disk_max_entries=settings.embedding_cache_disk_max_entries,
+    )
+
+
+def embedding_cache_stats() -> dict:
+    return get_embedding_cache().stats()
+
+
+def _encode_batch(texts: list[str]) -> np.ndarray:
+    # Runs on the GPU thread, possibly over several callers' texts at once --
+    # one padded forward pass instead of one per caller.
+    model = get_embedding_model()
+    return np.asarray(model.encode(texts, normalize_embeddings=True, show_progress_bar=False))
+
+
 def embed_texts(texts: list[str]) -> np.ndarray:
-    """Returns L2-normalized embeddings, so a dot product equals cosine similarity."""
+    """Returns L2-normalized embeddings, so a dot product equals cosine similarity.
+
+    Only texts missing from the embedding cache reach the model, each
+    distinct one exactly once, even if it repeats within `texts`.
+    """
     if not texts:
         return np.empty((0, 0))
 
-    def _encode() -> np.ndarray:
-        model = get_embedding_model()
-        return np.asarray(model.encode(texts, normalize_embeddings=True, show_progress_bar=False))
+    cache = get_embedding_cache()
+    keys = [cache.key(text) for text in texts]
+    cached = cache.get_many(keys)
+
+    missing: dict[str, str] = {}
+    for key, text, vector in zip(keys, texts, cached):
+        if vector is None and key not in missing:
+            missing[key] = text
+
+    fresh: dict[str, np.ndarray] = {}
+    if missing:
+        encoded = np.asarray(
+            run_batched_on_gpu_thread(f"embed:{settings.embedding_model}", _encode_batch, list(missing.values()))
+        )
+        cache.put_many(list(missing), encoded)
+        fresh = dict(zip(missing, encoded))
 
-    return run_on_gpu_thread(_encode)
+    return np.vstack([vector if vector is not None else fresh[key] for key, vector in zip(keys, cached)])
@@ -1,5 +1,13 @@
 import concurrent.futures
-from typing import Callable, TypeVar
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence, TypeVar
+
+import numpy as np
+
+from app.config import settings
 
 T = TypeVar("T")
 
@@ -8,10 +16,174 @@ T = TypeVar("T")
 # context over time, and this torch/cuBLASLt/driver combo corrupts under
 # that cross-thread reuse (CUBLAS_STATUS_EXECUTION_FAILED), even when calls
 # are individually serialized by a lock. Routing every GPU call through one
-# permanent single-worker thread means the CUDA context is only ever touched
-# from that one thread for the life of the process.
-_GPU_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpu-worker")
+# permanent worker thread means the CUDA context is only ever touched from
+# that one thread for the life of the process.
+#
+# That thread is also a micro-batching scheduler. Several candidate threads
+# (recruiter_prescreen_concurrency, round 2/3 concurrency) each submit small
+# embed/rerank calls; run one at a time, every call would be its own tiny
+# forward pass. Instead, requests submitted through run_batched_on_gpu_thread
+# are collected for up to gpu_batch_window_ms (or gpu_batch_max_items items),
+# concatenated per batch key (one key per model), run as ONE padded batch,
+# and the results are scattered back to each caller's future.
+
+
+@dataclass
+class _GpuRequest:
+    future: concurrent.futures.Future
+    fn: Callable[..., Any] | None = None  # unbatched: call as-is
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    batch_key: str | None = None  # batched: concatenated with same-key requests
+    batch_fn: Callable[[list], Sequence] | None = None
+    items: list = field(default_factory=list)
+
+
+_queue: "queue.Queue[_GpuRequest]" = queue.Queue()
+_stats_lock = threading.Lock()
+_stats = {
+    "batches": 0,
+    "batched_requests": 0,
+    "batched_items": 0,
+    "max_batch_items": 0,
+    "last_batch_items": 0,
+    "unbatched_calls": 0,
+}
+
+
+def _run_unbatched(request: _GpuRequest) -> None:
+    if not request.future.set_running_or_notify_cancel():
+        return
+    try:
+        request.future.set_result(request.fn(*request.args, **request.kwargs))
+    except BaseException as e:
+        request.future.set_exception(e)
+    with _stats_lock:
+        _stats["unbatched_calls"] += 1
+
+
+def _concat_results(parts: list[Sequence]) -> Sequence:
+    if len(parts) == 1:
+        return parts[0]
+    if isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    return [result for part in parts for result in part]
+
+
+def _run_batch(requests: list[_GpuRequest]) -> None:
+    requests = [r for r in requests if r.future.set_running_or_notify_cancel()]
+    if not requests:
+        return
+    flat = [item for r in requests for item in r.items]
+    # One forward pass never exceeds gpu_batch_max_items, even when a single
+    # caller submitted more: its items are run in slices and the results
+    # reassembled before being scattered back.
+    max_items = max(1, settings.gpu_batch_max_items)
+    slices = [flat[start : start + max_items] for start in range(0, len(flat), max_items)]
+    try:
+        parts = []
+        for items in slices:
+            part = requests[0].batch_fn(items)
+            if len(part) != len(items):
+                raise RuntimeError(f"batch fn returned {len(part)} results for {len(items)} items")
+            parts.append(part)
+        results = _concat_results(parts)
+    except BaseException as e:
+        for r in requests:
+            r.future.set_exception(e)
+        return
+
+    start = 0
+    for r in requests:
+        end = start + len(r.items)
+        r.future.set_result(results[start:end])
+        start = end
+
+    with _stats_lock:
+        _stats["batches"] += len(slices)
+        _stats["batched_requests"] += len(requests)
+        _stats["batched_items"] += len(flat)
+        _stats["last_batch_items"] = len(slices[-1])
+        _stats["max_batch_items"] = max(_stats["max_batch_items"], len(slices[0]))
+
+
+def _collect(first: _GpuRequest) -> list[_GpuRequest]:
+    """Greedily gathers whatever else arrives within the batching window,
+    stopping early once enough batchable items are pending."""
+    pending = [first]
+    if first.batch_key is None:
+        return pending
+    item_count = len(first.items)
+    deadline = time.monotonic() + settings.gpu_batch_window_ms / 1000
+    while item_count < settings.gpu_batch_max_items:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            request = _queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        pending.append(request)
+        item_count += len(request.items)
+    return pending
+
+
+def _gpu_worker() -> None:
+    while True:
+        pending = _collect(_queue.get())
+        # Group batched requests by key (one padded forward pass per model),
+        # keeping first-arrival order across groups; unbatched calls run in
+        # arrival order alongside them.
+        groups: dict[str, list[_GpuRequest]] = {}
+        for request in pending:
+            if request.batch_key is None:
+                _run_unbatched(request)
+            else:
+                groups.setdefault(request.batch_key, []).append(request)
+        for group in groups.values():
+            # Whole requests are packed up to gpu_batch_max_items per batch;
+            # one larger than that on its own is sliced in _run_batch.
+            chunk: list[_GpuRequest] = []
+            chunk_items = 0
+            for request in group:
+                if chunk and chunk_items + len(request.items) > settings.gpu_batch_max_items:
+                    _run_batch(chunk)
+                    chunk, chunk_items = [], 0
+                chunk.append(request)
+                chunk_items += len(request.items)
+            if chunk:
+                _run_batch(chunk)
+
+
+_GPU_THREAD = threading.Thread(target=_gpu_worker, name="gpu-worker", daemon=True)
+_GPU_THREAD.start()
 
 
 def run_on_gpu_thread(fn: Callable[..., T], *args, **kwargs) -> T:
-    return _GPU_EXECUTOR.submit(fn, *args, **kwargs).result()
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    _queue.put(_GpuRequest(future=future, fn=fn, args=args, kwargs=kwargs))
+    return future.result()
+
+
+def run_batched_on_gpu_thread(batch_key: str, batch_fn: Callable[[list], Sequence[T]], items: list) -> Sequence[T]:
+    """Runs `batch_fn` over `items` on the GPU thread, possibly concatenated
+    with other callers' items under the same `batch_key`. `batch_fn` must map
+    a flat list of items to a same-length, sliceable sequence of results (a
+    list or an ndarray whose first axis is per-item); this caller gets back
+    exactly the slice for its own items, in order.
+    """
+    if not items:
+        return []
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    _queue.put(_GpuRequest(future=future, batch_key=batch_key, batch_fn=batch_fn, items=list(items)))
+    return future.result()
+
+
+def gpu_scheduler_stats() -> dict:
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot["queue_depth"] = _queue.qsize()
+    snapshot["avg_batch_items"] = (
+        snapshot["batched_items"] / snapshot["batches"] if snapshot["batches"] else 0.0
+    )
+    return snapshot
@@ -1,12 +1,15 @@
+import asyncio
 import json
 import re
-import time
 from functools import lru_cache
 
-from groq import BadRequestError, Groq, RateLimitError
+from groq import AsyncGroq, BadRequestError, RateLimitError
 from pydantic import BaseModel
 
 from app.config import settings
+from app.core.llm_loop import on_llm_loop, run_on_llm_loop
+from app.core.rate_limit import admitted, model_limits
+from app.core.tokenizers import get_tokenizer, truncate_to_tokens
 
 _MAX_RETRY_ATTEMPTS = 5
 _DEFAULT_BACKOFF_SECONDS = 5.0
@@ -22,27 +25,17 @@ _MAX_MALFORMED_RETRY_ATTEMPTS = 2
 # for a very long time with zero visibility, indistinguishable from a hang.
 _MAX_BACKOFF_SECONDS = 75.0
 
-# Per-model TPM ceilings on Groq's free/on-demand tier (see console.groq.com
-# rate limits). A 413 "request too large" is NOT retryable -- the same
-# oversized request fails every time -- so this must be checked and the
-# prompt trimmed *before* sending, not handled reactively like rate limits.
-_MODEL_TPM_LIMITS = {
-    "llama-3.1-8b-instant": 6000,
-    "llama-3.3-70b-versatile": 12000,
-    "openai/gpt-oss-20b": 8000,
-    "openai/gpt-oss-120b": 8000,
-    "qwen/qwen3.6-27b": 8000,
-}
-_DEFAULT_TPM_LIMIT = 6000  # conservative fallback for any unlisted model
-_CHARS_PER_TOKEN_ESTIMATE = 4  # rough heuristic, no tokenizer dependency needed
-# Real technical text (resumes/JDs: acronyms, punctuation, camelCase schema
-# fields) tokenizes less efficiently than plain English, so the 4-chars/token
-# heuristic underestimates true usage. A wide margin absorbs that error.
-_TPM_SAFETY_MARGIN = 0.7
-
-
-def _estimate_tokens(text: str) -> int:
-    return len(text) // _CHARS_PER_TOKEN_ESTIMATE
+# A 413 "request too large" is NOT retryable -- the same oversized request
+# fails every time -- so each prompt is checked against its model's TPM
+# ceiling (per-model quotas live in app/core/rate_limit.py) and trimmed
+# *before* sending, not handled reactively like rate limits. Token counts
+# come from the model family's real tokenizer when one is loaded (see
+# app/core/tokenizers.py), with the chars/token heuristic as the fallback.
+_TRUNCATION_MARKER = "\n\n[...input truncated to fit the model's context limit...]"
+
+
+def estimate_tokens(text: str, model: str | None = None) -> int:
+    return get_tokenizer(model).count(text)
 
 
 def _fit_user_prompt_to_budget(
@@ -51,24 +44,32 @@ def _fit_user_prompt_to_budget(
     """Truncates `user` so system + user + completion (+ any extra, e.g. a
     tool schema) tokens stay under the model's per-minute ceiling, instead of
     discovering the overage as a 413 only after the request is already sent.
+
+    With an exact tokenizer the safety margin shrinks from 30% to 5%, so
+    each request packs that much more context; either way the cut falls on
+    a section, then line, then token boundary (see `truncate_to_tokens`)
+    rather than at an arbitrary character.
     """
-    tpm_limit = _MODEL_TPM_LIMITS.get(model, _DEFAULT_TPM_LIMIT)
-    budget = int(tpm_limit * _TPM_SAFETY_MARGIN) - max_completion_tokens - extra_tokens
-    available_for_user = max(200, budget - _estimate_tokens(system))
+    tokenizer = get_tokenizer(model)
+    tpm_limit = model_limits("groq", model).tokens_per_minute
+    budget = int(tpm_limit * tokenizer.safety_margin) - max_completion_tokens - extra_tokens
+    available_for_user = max(200, budget - tokenizer.count(system))
 
-    if _estimate_tokens(user) <= available_for_user:
+    if tokenizer.count(user) <= available_for_user:
         return user
 
-    max_chars = available_for_user * _CHARS_PER_TOKEN_ESTIMATE
-    return user[:max_chars] + "\n\n[...input truncated to fit the model's context limit...]"
+    kept = truncate_to_tokens(user, available_for_user - tokenizer.count(_TRUNCATION_MARKER), tokenizer)
+    return kept + _TRUNCATION_MARKER
 
 
 @lru_cache
-def get_groq_client() -> Groq:
+def get_groq_client() -> AsyncGroq:
     # An explicit timeout matters here: without one, a stalled connection
-    # can block a worker thread forever with no way to recover, rather than
-    # failing loudly so the retry logic in _call_with_retry can act.
-    return Groq(api_key=settings.groq_api_key, timeout=60.0)
+    # can block a call forever with no way to recover, rather than failing
+    # loudly so the retry logic in _call_with_retry can act. The client (and
+    # its keep-alive pool) is only ever used on the LLM loop -- see
+    # app/core/llm_loop.py.
+    return AsyncGroq(api_key=settings.groq_api_key, timeout=60.0)
 
 
 def _retry_delay_seconds(error: RateLimitError) -> float:
@@ -118,10 +119,18 @@ def is_daily_quota_error(error: RateLimitError) -> bool:
     return "per day" in str(error).lower()
 
 
-def _call_with_retry(fn):
+async def _call_with_retry(fn, model: str, estimated_tokens: int):
+    """Awaits `fn()` (one Groq request) under `model`'s shared rate budget
+    (see app/core/rate_limit.py): each attempt is admitted as soon as the
+    RPM/TPM budget covers `estimated_tokens`, and settled against the usage
+    the response reports. The 429 backoff below stays as the safety net for
+    quota consumed outside this process."""
     for attempt in range(_MAX_RETRY_ATTEMPTS):
         try:
-            return fn()
+            async with admitted("groq", model, estimated_tokens) as usage:
+                response = await fn()
+                usage.report(getattr(getattr(response, "usage", None), "total_tokens", None))
+                return response
         except RateLimitError as e:
             if is_daily_quota_error(e):
                 print("[groq] daily quota exhausted, not retrying", flush=True)
@@ -134,26 +143,17 @@ def _call_with_retry(fn):
                 f"waiting {wait:.1f}s before retry",
                 flush=True,
             )
-            time.sleep(wait)
+            await asyncio.sleep(wait)
 
 
-def call_llm(
+async def _call_llm(
     system: str,
     user: str,
-    model: str | None = None,
-    temperature: float = 0.3,
-    max_tokens: int = 1024,
-    reasoning_effort: str | None = None,
+    model: str | None,
+    temperature: float,
+    max_tokens: int,
+    reasoning_effort: str | None,
 ) -> str:
-    """Plain-text completion (cover letters, free-form prose).
-
-    reasoning_effort is only meaningful for reasoning-capable models (Qwen,
-    gpt-oss) -- their default behavior is to spend a chunk of max_tokens on
-    an internal <think> trace before the actual answer, which can consume
-    the whole budget and leave nothing for the response itself.
-    "none" suppresses that trace entirely. Omitted (not passed) for models
-    that don't support the param, since Groq rejects it outright otherwise.
-    """
     resolved_model = model or settings.llm_model
     user = _fit_user_prompt_to_budget(system, user, resolved_model, max_tokens)
     client = get_groq_client()
@@ -173,25 +173,54 @@ def call_llm(
             **kwargs,
         )
 
-    response = _call_with_retry(_make_request)
+    estimated_tokens = (
+        estimate_tokens(system, resolved_model) + estimate_tokens(user, resolved_model) + max_tokens
+    )
+    response = await _call_with_retry(_make_request, resolved_model, estimated_tokens)
     return response.choices[0].message.content or ""
 
 
-def call_structured(
+def call_llm(
     system: str,
     user: str,
-    schema: type[BaseModel],
     model: str | None = None,
-    temperature: float = 0.2,
-    max_completion_tokens: int = 1024,
-) -> BaseModel:
-    """Force the model to return JSON matching `schema` via tool-calling.
+    temperature: float = 0.3,
+    max_tokens: int = 1024,
+    reasoning_effort: str | None = None,
+) -> str:
+    """Plain-text completion (cover letters, free-form prose).
 
-    Replaces the old approach of regexing `{...}` out of free-form text --
-    Groq validates the tool-call arguments against the JSON schema itself,
-    so a malformed response fails the API call instead of silently parsing
-    into garbage.
+    reasoning_effort is only meaningful for reasoning-capable models (Qwen,
+    gpt-oss) -- their default behavior is to spend a chunk of max_tokens on
+    an internal <think> trace before the actual answer, which can consume
+    the whole budget and leave nothing for the response itself.
+    "none" suppresses that trace entirely. Omitted (not passed) for models
+    that don't support the param, since Groq rejects it outright otherwise.
     """
+    return run_on_llm_loop(_call_llm(system, user, model, temperature, max_tokens, reasoning_effort))
+
+
+async def call_llm_async(
+    system: str,
+    user: str,
+    model: str | None = None,
+    temperature: float = 0.3,
+    max_tokens: int = 1024,
+    reasoning_effort: str | None = None,
+) -> str:
+    """`call_llm` for async callers -- awaits the request without holding a
+    thread."""
+    return await on_llm_loop(_call_llm(system, user, model, temperature, max_tokens, reasoning_effort))
+
+
+async def _call_structured(
+    system: str,
+    user: str,
+    schema: type[BaseModel],
+    model: str | None,
+    temperature: float,
+    max_completion_tokens: int,
+) -> BaseModel:
     resolved_model = model or settings.llm_model
     client = get_groq_client()
     tool_name = f"emit_{schema.__name__.lower()}"
@@ -206,7 +235,7 @@ def call_structured(
     # The tool/function schema is itself part of the request payload and
     # counts against the same TPM budget -- ignoring it was a real gap that
     # let requests through under-counted by up to a couple hundred tokens.
-    tool_schema_tokens = _estimate_tokens(json.dumps(tool))
+    tool_schema_tokens = estimate_tokens(json.dumps(tool), resolved_model)
     user = _fit_user_prompt_to_budget(
         system, user, resolved_model, max_completion_tokens, extra_tokens=tool_schema_tokens
     )
@@ -227,9 +256,15 @@ def call_structured(
             max_completion_tokens=max_completion_tokens,
         )
 
+    estimated_tokens = (
+        estimate_tokens(system, resolved_model)
+        + estimate_tokens(user, resolved_model)
+        + tool_schema_tokens
+        + max_completion_tokens
+    )
     for attempt in range(_MAX_MALFORMED_RETRY_ATTEMPTS + 1):
         try:
-            response = _call_with_retry(_make_request)
+            response = await _call_with_retry(_make_request, resolved_model, estimated_tokens)
         except BadRequestError as e:
             recovered = _recover_from_malformed_tool_call(e, schema)
             if recovered is not None:
@@ -251,3 +286,34 @@ def call_structured(
 
         arguments = message.tool_calls[0].function.arguments
         return schema.model_validate_json(arguments)
+
+
+def call_structured(
+    system: str,
+    user: str,
+    schema: type[BaseModel],
+    model: str | None = None,
+    temperature: float = 0.2,
+    max_completion_tokens: int = 1024,
+) -> BaseModel:
+    """Force the model to return JSON matching `schema` via tool-calling.
+
+    Replaces the old approach of regexing `{...}` out of free-form text --
+    Groq validates the tool-call arguments against the JSON schema itself,
+    so a malformed response fails the API call instead of silently parsing
+    into garbage.
+    """
+    return run_on_llm_loop(_call_structured(system, user, schema, model, temperature, max_completion_tokens))
+
+
+async def call_structured_async(
+    system: str,
+    user: str,
+    schema: type[BaseModel],
+    model: str | None = None,
+    temperature: float = 0.2,
+    max_completion_tokens: int = 1024,
+) -> BaseModel:
+    """`call_structured` for async callers -- same retries and malformed
+    tool-call recovery, awaited without holding a thread."""
+    return await on_llm_loop(_call_structured(system, user, schema, model, temperature, max_completion_tokens))
@@ -0,0 +1,87 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from functools import lru_cache
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+# Every outbound LLM request (Groq, Gemini, Ollama) runs as a coroutine on
+# ONE permanent event loop in its own daemon thread -- the same "one owner
+# thread" shape as the GPU worker in gpu_lock.py, for a different reason.
+# The async clients' keep-alive connection pools are bound to the loop that
+# first used them, so a single long-lived loop means every caller shares
+# one warm pool per provider. And a call in flight costs a suspended
+# coroutine, not a parked thread: recruiter rounds 2/3 fan out hundreds of
+# calls without pinning a to_thread worker for the 10-90 s each one takes.
+#
+# Sync code (job seeker pipeline, to_thread workers) blocks on
+# `run_on_llm_loop`; async code awaits `on_llm_loop` from any other loop.
+
+
+@lru_cache
+def get_llm_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+    return loop
+
+
+def _on_loop_thread() -> bool:
+    try:
+        return asyncio.get_running_loop() is get_llm_loop()
+    except RuntimeError:
+        return False
+
+
+def _submit(coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """Schedules `coro` on the LLM loop in a copy of the caller's context, so
+    log routing (app_logging's contextvar) follows the call across threads."""
+    loop = get_llm_loop()
+    context = contextvars.copy_context()
+    result: concurrent.futures.Future = concurrent.futures.Future()
+
+    def start() -> None:
+        if not result.set_running_or_notify_cancel():
+            coro.close()
+            return
+        try:
+            # create_task(context=...) is 3.11+; a task created inside
+            # context.run starts from (a copy of) that context on 3.10 too.
+            task = context.run(loop.create_task, coro)
+        except BaseException as exc:
+            # Never leave the caller blocked on a future nothing will resolve.
+            coro.close()
+            result.set_exception(exc)
+            return
+
+        def finished(t: asyncio.Task) -> None:
+            if t.cancelled():
+                # Future.cancel() is refused once running -- surface it as
+                # the exception a caller awaiting the task would have seen.
+                result.set_exception(concurrent.futures.CancelledError())
+            elif t.exception() is not None:
+                result.set_exception(t.exception())
+            else:
+                result.set_result(t.result())
+
+        task.add_done_callback(finished)
+
+    loop.call_soon_threadsafe(start)
+    return result
+
+
+def run_on_llm_loop(coro: Coroutine[Any, Any, T]) -> T:
+    """Blocking: runs `coro` on the LLM loop and returns its result."""
+    if _on_loop_thread():
+        coro.close()
+        raise RuntimeError("run_on_llm_loop called from the LLM loop itself -- await the coroutine instead")
+    return _submit(coro).result()
+
+
+async def on_llm_loop(coro: Coroutine[Any, Any, T]) -> T:
+    """Awaitable from any event loop: runs `coro` on the LLM loop (directly,
+    if already there) without blocking the caller's loop."""
+    if _on_loop_thread():
+        return await coro
+    return await asyncio.wrap_future(_submit(coro))
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from app.core.bm25_index import sparse_terms
+from app.core.vector_store import VectorStoreBackend, chunk_point_id, document_fingerprint
+
+# Batches are locked independently -- striped rather than one lock per
+# batch_id, so the lock table never grows with the number of batches seen.
+_BATCH_LOCK_STRIPES = 64
+
+
+@dataclass
+class _LocalDocument:
+    """Every chunk of one document: a contiguous (chunks x dim) float32
+    matrix plus one payload dict per row, same order."""
+
+    vectors: np.ndarray
+    rows: list[dict]
+
+
+class LocalVectorStore(VectorStoreBackend):
+    """Embedded, in-process alternative to Qdrant -- selected with
+    `vector_store_backend="local"`.
+
+    Each document's chunks live in memory as their own NumPy matrix, so an
+    upsert or delete touches only the documents it names -- never the rest
+    of a batch that may hold hundreds of resumes. If `directory` is set
+    they're also persisted: one `.npy` per document under a directory per
+    batch (loaded back memory-mapped, so a restart doesn't pull every vector
+    into RAM up front) and each row's payload in one SQLite file. Without a
+    directory it's purely in-memory -- fine for tests and single-process
+    runs, where job-seeker uploads are deleted right after use anyway.
+
+    Locking is per batch (striped), so indexing one job's batch never blocks
+    reads of another's; the shared SQLite connection has its own lock, held
+    only for each statement group.
+    """
+
+    def __init__(self, directory: str = ""):
+        self._lock = threading.Lock()  # guards _batches only
+        self._batch_locks = [threading.Lock() for _ in range(_BATCH_LOCK_STRIPES)]
+        self._batches: dict[str, dict[str, _LocalDocument]] = {}
+        self._dir = Path(directory) if directory else None
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            # One connection shared across worker threads -- every access
+            # goes through self._db_lock.
+            self._db = sqlite3.connect(self._dir / "chunks.sqlite3", check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS document_chunks ("
+                "batch_id TEXT NOT NULL, filename TEXT NOT NULL, row INTEGER NOT NULL, payload TEXT NOT NULL, "
+                "PRIMARY KEY (batch_id, filename, row))"
+            )
+            self._db.commit()
+
+    def _batch_lock(self, batch_id: str) -> threading.Lock:
+        stripe = int.from_bytes(hashlib.blake2b(batch_id.encode("utf-8"), digest_size=4).digest(), "big")
+        return self._batch_locks[stripe % _BATCH_LOCK_STRIPES]
+
+    def _batch_dir(self, batch_id: str) -> Path:
+        return self._dir / re.sub(r"[^A-Za-z0-9_-]+", "_", batch_id)
+
+    def _document_path(self, batch_id: str, filename: str) -> Path:
+        # Hashed: filenames are arbitrary upload names.
+        return self._batch_dir(batch_id) / f"{hashlib.sha1(filename.encode('utf-8')).hexdigest()}.npy"
+
+    def _load(self, batch_id: str) -> dict[str, _LocalDocument] | None:
+        """The batch's documents, loaded from disk on first use. Caller holds
+        the batch's lock."""
+        with self._lock:
+            documents = self._batches.get(batch_id)
+        if documents is not None or self._dir is None:
+            return documents
+        with self._db_lock:
+            records = self._db.execute(
+                "SELECT filename, payload FROM document_chunks WHERE batch_id = ? ORDER BY filename, row",
+                (batch_id,),
+            ).fetchall()
+        if not records:
+            return None
+        rows_by_filename: dict[str, list[dict]] = {}
+        for filename, payload in records:
+            rows_by_filename.setdefault(filename, []).append(json.loads(payload))
+        documents = {}
+        for filename, rows in rows_by_filename.items():
+            path = self._document_path(batch_id, filename)
+            if not path.exists():
+                continue
+            vectors = np.load(path, mmap_mode="r")
+            # A crash between the matrix and payload writes leaves them
+            # disagreeing -- treat the document as not stored, so its next
+            # fingerprint check re-indexes it.
+            if vectors.shape[0] == len(rows):
+                documents[filename] = _LocalDocument(vectors=vectors, rows=rows)
+        with self._lock:
+            self._batches[batch_id] = documents
+        return documents
+
+    def _write_document(self, batch_id: str, filename: str, document: _LocalDocument | None) -> None:
+        """Persists (or, with None, removes) one document. Caller holds the
+        batch's lock."""
+        if self._dir is None:
+            return
+        path = self._document_path(batch_id, filename)
+        if document is None:
+            path.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so a crash mid-save never leaves a torn matrix.
+            tmp_path = path.with_suffix(".tmp.npy")
+            np.save(tmp_path, document.vectors)
+            os.replace(tmp_path, path)
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM document_chunks WHERE batch_id = ? AND filename = ?", (batch_id, filename)
+            )
+            if document is not None:
+                self._db.executemany(
+                    "INSERT INTO document_chunks (batch_id, filename, row, payload) VALUES (?, ?, ?, ?)",
+                    [(batch_id, filename, i, json.dumps(row)) for i, row in enumerate(document.rows)],
+                )
+            self._db.commit()
+
+    def _drop_batch(self, batch_id: str) -> None:
+        """Forgets a whole batch. Caller holds the batch's lock."""
+        with self._lock:
+            self._batches.pop(batch_id, None)
+        if self._dir is None:
+            return
+        with self._db_lock:
+            self._db.execute("DELETE FROM document_chunks WHERE batch_id = ?", (batch_id,))
+            self._db.commit()
+        shutil.rmtree(self._batch_dir(batch_id), ignore_errors=True)
+
+    def upsert_documents(self, batch_id: str, documents: dict[str, tuple[list[str], np.ndarray]]) -> None:
+        if not documents:
+            return
+        created_at = time.time()
+        fresh: dict[str, _LocalDocument] = {}
+        for filename, (chunks, vectors) in documents.items():
+            doc_hash = document_fingerprint(chunks)
+            rows = [
+                {
+                    "id": chunk_point_id(batch_id, filename, i, chunks[i]),
+                    "filename": filename,
+                    "chunk_index": i,
+                    "text": chunks[i],
+                    **sparse_terms(chunks[i]),
+                    "doc_hash": doc_hash,
+                    "created_at": created_at,
+                }
+                for i in range(len(chunks))
+            ]
+            fresh[filename] = _LocalDocument(vectors=np.ascontiguousarray(vectors, dtype=np.float32), rows=rows)
+        with self._batch_lock(batch_id):
+            stored = self._load(batch_id)
+            if stored is None:
+                stored = {}
+                with self._lock:
+                    self._batches[batch_id] = stored
+            for filename, document in fresh.items():
+                # Replace semantics, matching Qdrant's overwrite-by-ID: the
+                # document's previous chunks, if any, are dropped wholesale.
+                stored[filename] = document
+                self._write_document(batch_id, filename, document)
+
+    def iter_chunks(
+        self, batch_id: str, filenames: list[str], with_vectors: bool = True, with_payload: bool = True
+    ) -> Iterator[dict]:
+        # Materialized under the lock, then yielded -- a slow consumer never
+        # holds the batch's lock between items.
+        with self._batch_lock(batch_id):
+            stored = self._load(batch_id)
+            if stored is None:
+                return
+            chunks = []
+            for filename in filenames:
+                document = stored.get(filename)
+                if document is None:
+                    continue
+                for i, row in enumerate(document.rows):
+                    chunk = {"id": row["id"], "filename": filename, "doc_hash": row.get("doc_hash")}
+                    if with_payload:
+                        chunk["text"] = row["text"]
+                        chunk["chunk_index"] = row["chunk_index"]
+                        if "term_ids" in row:
+                            chunk.update({key: row[key] for key in ("term_ids", "term_freqs", "token_count")})
+                    if with_vectors:
+                        chunk["vector"] = np.array(document.vectors[i])
+                    chunks.append(chunk)
+        yield from chunks
+
+    def delete(self, batch_id: str, filename: str) -> None:
+        with self._batch_lock(batch_id):
+            stored = self._load(batch_id)
+            if stored is None or filename not in stored:
+                return
+            del stored[filename]
+            if stored:
+                self._write_document(batch_id, filename, None)
+            else:
+                self._drop_batch(batch_id)
+
+    def delete_batch(self, batch_id: str) -> None:
+        with self._batch_lock(batch_id):
+            if self._load(batch_id) is not None:
+                self._drop_batch(batch_id)
+
+    def delete_expired(self, created_before: float, exclude_batch_ids: list[str]) -> None:
+        with self._lock:
+            batch_ids = set(self._batches)
+        if self._db is not None:
+            with self._db_lock:
+                batch_ids.update(b for (b,) in self._db.execute("SELECT DISTINCT batch_id FROM document_chunks"))
+        for batch_id in batch_ids - set(exclude_batch_ids):
+            with self._batch_lock(batch_id):
+                stored = self._load(batch_id)
+                if stored is None:
+                    continue
+                for filename, document in list(stored.items()):
+                    # Rows without created_at predate it -- expired by definition.
+                    keep = [i for i, row in enumerate(document.rows) if row.get("created_at", 0.0) >= created_before]
+                    if len(keep) == len(document.rows):
+                        continue
+                    if keep:
+                        stored[filename] = _LocalDocument(
+                            vectors=np.ascontiguousarray(document.vectors[keep]),
+                            rows=[document.rows[i] for i in keep],
+                        )
+                        self._write_document(batch_id, filename, stored[filename])
+                    else:
+                        del stored[filename]
+                        self._write_document(batch_id, filename, None)
+                if not stored:
+                    self._drop_batch(batch_id)
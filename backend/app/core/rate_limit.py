@@ -0,0 +1,310 @@
+import asyncio
+import datetime as dt
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.config import settings
+
+# Waiters parked in `wait_for_capacity`. Every release resolves them all, so
+# a dispatcher waiting for "any provider has capacity" wakes as soon as one
+# does instead of polling each limiter on its own schedule. Admission waits
+# are coroutines (LLM calls all run on app/core/llm_loop.py's event loop),
+# so waiting costs no thread.
+_capacity_waiters: list[asyncio.Future] = []
+_capacity_waiters_lock = threading.Lock()
+
+
+class DailyQuotaExhausted(RuntimeError):
+    """A model's requests-per-day budget is spent. Unlike a per-minute limit
+    this won't clear for hours -- callers fall back to another tier/model
+    rather than wait."""
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously at
+    `rate_per_second`. A call spends tokens up front; with no tokens left it
+    reports failure immediately (`try_acquire`) and says how long the refill
+    will take (`seconds_until`). A rate of 0 means unlimited."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = max(0.0, rate_per_second)
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        if self.rate == 0:
+            return True
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return True
+            return False
+
+    def seconds_until(self, amount: float = 1.0) -> float:
+        """How long until `amount` tokens are available (0 if they already are)."""
+        if self.rate == 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            missing = min(amount, self.capacity) - self._tokens
+            return max(0.0, missing / self.rate)
+
+    def adjust(self, delta: float) -> None:
+        """Credits (positive) or debits (negative) tokens after the fact --
+        a debit may leave the bucket in debt, which future refills repay."""
+        if self.rate == 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    requests_per_minute: float  # 0 = unlimited, likewise below
+    tokens_per_minute: float
+    requests_per_day: int
+
+
+# Per-model quotas on Groq's free/on-demand tier (see console.groq.com rate
+# limits) -- Groq's quotas are per model, so every model is budgeted on its
+# own. Anything unlisted falls back to its provider's defaults below.
+MODEL_LIMITS: dict[str, ModelLimits] = {
+    "llama-3.1-8b-instant": ModelLimits(30, 6000, 14_400),
+    "llama-3.3-70b-versatile": ModelLimits(30, 12000, 1000),
+    "openai/gpt-oss-20b": ModelLimits(30, 8000, 1000),
+    "openai/gpt-oss-120b": ModelLimits(30, 8000, 1000),
+    "qwen/qwen3.6-27b": ModelLimits(60, 8000, 1000),
+}
+
+
+def model_limits(provider: str, model: str) -> ModelLimits:
+    if model in MODEL_LIMITS:
+        return MODEL_LIMITS[model]
+    # The rubric tiers' free quotas (see config.py): Ollama Cloud's
+    # ~14.4K req/day class, Gemini Flash Lite's 500/day and 250K TPM. A
+    # conservative 6,000 TPM for any unlisted Groq model.
+    if provider == "ollama":
+        return ModelLimits(settings.ollama_requests_per_minute, 0, 14_400)
+    if provider == "gemini":
+        return ModelLimits(settings.gemini_requests_per_minute, 250_000, 500)
+    return ModelLimits(settings.groq_requests_per_minute, 6000, 0)
+
+
+class ModelBudget:
+    """One provider/model's quotas, shared by every caller in the process:
+    requests per minute and tokens per minute as token buckets, requests per
+    day as a counter that resets when the date changes.
+
+    Token accounting is estimate-then-settle: a call is admitted against its
+    estimated prompt + completion tokens, and once the response reports real
+    usage the difference is credited back (or debited) -- so the next call
+    is admitted as soon as the real budget allows, not a fixed interval
+    later.
+    """
+
+    def __init__(self, provider: str, model: str, limits: ModelLimits):
+        self.provider = provider
+        self.model = model
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_minute / 60.0, limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute / 60.0, limits.tokens_per_minute)
+        self._lock = threading.Lock()
+        self._day = dt.date.today()
+        self._requests_today = 0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+
+    def _roll_day(self) -> None:
+        today = dt.date.today()
+        if today != self._day:
+            self._day, self._requests_today = today, 0
+
+    def daily_exhausted(self) -> bool:
+        with self._lock:
+            self._roll_day()
+            return bool(self.limits.requests_per_day) and self._requests_today >= self.limits.requests_per_day
+
+    def ready(self, estimated_tokens: int = 0) -> bool:
+        """Whether a call could be admitted right now (spends nothing)."""
+        return (
+            not self.daily_exhausted()
+            and self.requests.seconds_until() == 0
+            and self.tokens.seconds_until(estimated_tokens or 1) == 0
+        )
+
+    def try_admit(self, estimated_tokens: int) -> float:
+        """Spends one request and `estimated_tokens` if RPM and TPM both allow
+        it now (returns 0), else returns how long until they would. Raises
+        DailyQuotaExhausted instead of waiting out a daily quota."""
+        with self._lock:
+            self._roll_day()
+            if self.limits.requests_per_day and self._requests_today >= self.limits.requests_per_day:
+                raise DailyQuotaExhausted(f"{self.provider}/{self.model}: requests-per-day budget spent")
+            wait = max(self.requests.seconds_until(), self.tokens.seconds_until(estimated_tokens))
+            if wait == 0 and self.requests.try_acquire() and self.tokens.try_acquire(estimated_tokens):
+                self._requests_today += 1
+                self.estimated_tokens += estimated_tokens
+                return 0.0
+            return max(0.01, wait)
+
+    async def admit(self, estimated_tokens: int) -> None:
+        """Waits until RPM and TPM both allow this call, then spends them."""
+        while wait := self.try_admit(estimated_tokens):
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int) -> None:
+        # Under the same lock as try_admit: a debit landing between its
+        # seconds_until check and its two acquires could otherwise fail the
+        # token acquire after the request token was already spent.
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+            self.actual_tokens += actual_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._roll_day()
+            return {
+                "requests_today": self._requests_today,
+                "requests_per_day": self.limits.requests_per_day,
+                "estimated_tokens": self.estimated_tokens,
+                "actual_tokens": self.actual_tokens,
+            }
+
+
+_budgets: dict[tuple[str, str], ModelBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def get_model_budget(provider: str, model: str) -> ModelBudget:
+    with _budgets_lock:
+        budget = _budgets.get((provider, model))
+        if budget is None:
+            budget = ModelBudget(provider, model, model_limits(provider, model))
+            _budgets[(provider, model)] = budget
+        return budget
+
+
+class Usage:
+    """Handed to the body of `admitted(...)`; report the response's real
+    token usage through it (left unreported, the estimate stands)."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: int | None = None
+
+    def report(self, actual_tokens: int | None) -> None:
+        if actual_tokens:
+            self.actual_tokens = int(actual_tokens)
+
+
+@asynccontextmanager
+async def admitted(provider: str, model: str, estimated_tokens: int) -> AsyncIterator[Usage]:
+    """Wraps one LLM request: waits for `model`'s RPM/TPM budget (raising
+    DailyQuotaExhausted if its daily budget is spent), then settles the
+    token estimate against whatever the body reports."""
+    budget = get_model_budget(provider, model)
+    await budget.admit(estimated_tokens)
+    usage = Usage(estimated_tokens)
+    try:
+        yield usage
+    finally:
+        budget.settle(estimated_tokens, usage.actual_tokens if usage.actual_tokens is not None else estimated_tokens)
+
+
+class ProviderLimiter:
+    """Concurrency cap for one LLM provider: at most `max_concurrency` calls
+    in flight across the process. Request/token quotas live per model in
+    ModelBudget; `try_acquire(model)` also declines a slot that model's
+    budget couldn't admit right now, so a dispatcher moves on to a tier that
+    can actually start."""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, model: str | None = None) -> bool:
+        """Takes a slot only if one is free right now -- never blocks."""
+        if model is not None and not get_model_budget(self.name, model).ready():
+            return False
+        with self._lock:
+            if self._in_flight >= self.max_concurrency:
+                return False
+            self._in_flight += 1
+            return True
+
+    async def acquire(self) -> None:
+        while not self.try_acquire():
+            await wait_for_capacity(1.0)
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+        with _capacity_waiters_lock:
+            waiters = _capacity_waiters[:]
+            _capacity_waiters.clear()
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": self._in_flight, "max_concurrency": self.max_concurrency}
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+async def wait_for_capacity(timeout: float) -> None:
+    """Returns once some limiter releases a slot, or `timeout` seconds pass
+    (budget refills are time-based, so callers always pass a finite timeout)."""
+    waiter = asyncio.get_running_loop().create_future()
+    with _capacity_waiters_lock:
+        _capacity_waiters.append(waiter)
+    try:
+        await asyncio.wait_for(waiter, timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with _capacity_waiters_lock:
+            if waiter in _capacity_waiters:
+                _capacity_waiters.remove(waiter)
+
+
+_PROVIDER_CONCURRENCY = {
+    "ollama": lambda: settings.ollama_max_concurrency,
+    "gemini": lambda: settings.gemini_max_concurrency,
+    "groq": lambda: settings.groq_max_concurrency,
+}
+
+
+@lru_cache
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    # One limiter per provider for the whole process -- several candidates'
+    # rubric evaluations running at once all draw from the same quota.
+    return ProviderLimiter(provider, _PROVIDER_CONCURRENCY[provider]())
+
+
+def rate_limit_stats() -> dict:
+    with _budgets_lock:
+        budgets = list(_budgets.values())
+    return {
+        "providers": {provider: get_provider_limiter(provider).stats() for provider in _PROVIDER_CONCURRENCY},
+        "models": {f"{b.provider}/{b.model}": b.stats() for b in budgets},
+    }
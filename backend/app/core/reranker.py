@@ -3,7 +3,7 @@ from functools import lru_cache
 from sentence_transformers import CrossEncoder
 
 from app.config import settings
-from app.core.gpu_lock import run_on_gpu_thread
+from app.core.gpu_lock import run_batched_on_gpu_thread
 
 
 @lru_cache
@@ -11,14 +11,31 @@ def get_reranker() -> CrossEncoder:
     return CrossEncoder(settings.reranker_model)
 
 
-def rerank(query: str, candidates: list[str]) -> list[float]:
-    """Returns a relevance score per candidate, same order as input."""
-    if not candidates:
-        return []
+def _predict_batch(pairs: list[tuple[str, str]]) -> list[float]:
+    # Runs on the GPU thread, possibly over several callers' pairs at once.
+    model = get_reranker()
+    return [float(s) for s in model.predict(pairs)]
 
-    def _predict() -> list[float]:
-        model = get_reranker()
-        pairs = [(query, candidate) for candidate in candidates]
-        return [float(s) for s in model.predict(pairs)]
 
-    return run_on_gpu_thread(_predict)
+def rerank(query: str, candidates: list[str]) -> list[float]:
+    """Returns a relevance score per candidate, same order as input."""
+    return rerank_many([(query, candidates)])[0]
+
+
+def rerank_many(groups: list[tuple[str, list[str]]]) -> list[list[float]]:
+    """Multi-query rerank: scores every (query, candidates) group in ONE
+    flattened CrossEncoder batch, then splits the scores back per group --
+    one GPU round trip for a whole candidate's requirements instead of one
+    per requirement. Returns one score list per group, same order as input.
+    """
+    pairs = [(query, candidate) for query, candidates in groups for candidate in candidates]
+    if not pairs:
+        return [[] for _ in groups]
+
+    scores = list(run_batched_on_gpu_thread(f"rerank:{settings.reranker_model}", _predict_batch, pairs))
+    split: list[list[float]] = []
+    start = 0
+    for _, candidates in groups:
+        split.append(scores[start : start + len(candidates)])
+        start += len(candidates)
+    return split
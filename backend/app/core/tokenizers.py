@@ -0,0 +1,181 @@
+import contextvars
+import re
+import threading
+from functools import lru_cache
+
+from app.config import settings
+from app.core.app_logging import get_logger
+
+# Hub repos whose tokenizer matches each model family we call. The first
+# matching prefix wins; unlisted families (Gemini, Gemma via Ollama -- their
+# tokenizer repos are gated) use the heuristic below.
+_TOKENIZER_REPOS: list[tuple[str, str]] = [
+    ("llama-3", "NousResearch/Meta-Llama-3-8B-Instruct"),
+    ("openai/gpt-oss", "openai/gpt-oss-20b"),
+    ("qwen/qwen3", "Qwen/Qwen3-8B"),
+]
+
+_CHARS_PER_TOKEN_ESTIMATE = 4  # rough heuristic, no tokenizer dependency needed
+# Real technical text (resumes/JDs: acronyms, punctuation, camelCase schema
+# fields) tokenizes less efficiently than plain English, so the 4-chars/token
+# heuristic underestimates true usage. A wide margin absorbs that error.
+_HEURISTIC_SAFETY_MARGIN = 0.7
+# An exact count still misses the chat template's role/turn markers and the
+# tool-call wrapping around a structured response -- a few dozen tokens, so
+# a slim margin covers them.
+_EXACT_SAFETY_MARGIN = 0.95
+
+
+class HeuristicTokenizer:
+    """chars/4 estimate -- what every budget used before real tokenizers,
+    and still the fallback whenever one isn't available."""
+
+    exact = False
+    safety_margin = _HEURISTIC_SAFETY_MARGIN
+
+    def count(self, text: str) -> int:
+        return len(text) // _CHARS_PER_TOKEN_ESTIMATE
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, max_tokens) * _CHARS_PER_TOKEN_ESTIMATE]
+
+
+class HubTokenizer:
+    """A model family's real tokenizer (Hugging Face fast tokenizer): exact
+    counts, and truncation on a token boundary via offset mapping, so the
+    kept text is an exact prefix of the original."""
+
+    exact = True
+    safety_margin = _EXACT_SAFETY_MARGIN
+
+    def __init__(self, repo: str):
+        from transformers import AutoTokenizer
+
+        self.repo = repo
+        self._tokenizer = AutoTokenizer.from_pretrained(repo, use_fast=True)
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        offsets = self._tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        if len(offsets) <= max_tokens:
+            return text
+        return text[: offsets[max_tokens - 1][1]]
+
+
+_HEURISTIC = HeuristicTokenizer()
+
+
+class TokenizerRegistry:
+    """Per-family tokenizers, loaded lazily and never on a caller's path:
+    the first lookup for a family starts a background load and returns the
+    heuristic; once loaded, lookups return the real tokenizer. A family
+    whose load fails (offline, gated repo, transformers missing) stays on
+    the heuristic for the life of the process."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._loaded: dict[str, HubTokenizer | None] = {}  # None = load failed
+        self._loading: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, model: str | None) -> HeuristicTokenizer | HubTokenizer:
+        repo = _repo_for(model)
+        if repo is None or not self.enabled:
+            return _HEURISTIC
+        with self._lock:
+            if repo in self._loaded:
+                return self._loaded[repo] or _HEURISTIC
+            if repo not in self._loading:
+                self._loading.add(repo)
+                # In the caller's context, so get_logger() writes to the log
+                # of whichever pipeline triggered the load.
+                context = contextvars.copy_context()
+                threading.Thread(
+                    target=context.run, args=(self._load, repo), name="tokenizer-load", daemon=True
+                ).start()
+        return _HEURISTIC
+
+    def _load(self, repo: str) -> None:
+        try:
+            tokenizer = HubTokenizer(repo)
+        except Exception as e:
+            get_logger().warning(
+                "tokenizer %s unavailable, using chars/token heuristic (%s: %s)", repo, type(e).__name__, e
+            )
+            tokenizer = None
+        with self._lock:
+            self._loaded[repo] = tokenizer
+            self._loading.discard(repo)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": sorted(r for r, t in self._loaded.items() if t is not None),
+                "failed": sorted(r for r, t in self._loaded.items() if t is None),
+                "loading": sorted(self._loading),
+            }
+
+
+def _repo_for(model: str | None) -> str | None:
+    if not model:
+        return None
+    name = model.lower()
+    return next((repo for prefix, repo in _TOKENIZER_REPOS if name.startswith(prefix)), None)
+
+
+@lru_cache
+def get_tokenizer_registry() -> TokenizerRegistry:
+    return TokenizerRegistry(settings.exact_token_counting)
+
+
+def get_tokenizer(model: str | None) -> HeuristicTokenizer | HubTokenizer:
+    return get_tokenizer_registry().get(model)
+
+
+def tokenizer_stats() -> dict:
+    return get_tokenizer_registry().stats()
+
+
+# Coarsest first: blank-line-separated blocks (one evidence section per
+# requirement in a rubric prompt, one paragraph in a resume), then single
+# lines (one evidence snippet), then tokens.
+_SPLIT_LEVELS = (r"(\n\s*\n)", r"(\n)")
+
+
+def truncate_to_tokens(text: str, max_tokens: int, tokenizer: HeuristicTokenizer | HubTokenizer) -> str:
+    """Longest prefix of `text` within `max_tokens`, cut at the coarsest
+    boundary that fits: whole sections are kept while they fit, the first
+    one that doesn't is packed line by line, and only the first line that
+    doesn't fit is cut on a token boundary."""
+    if tokenizer.count(text) <= max_tokens:
+        return text
+    packed = _pack(text, max_tokens, tokenizer, 0)
+    # Pieces are counted separately, and tokenization isn't quite additive
+    # across a boundary -- trim the rare overshoot on a token boundary.
+    return packed if tokenizer.count(packed) <= max_tokens else tokenizer.truncate(packed, max_tokens)
+
+
+def _pack(text: str, max_tokens: int, tokenizer, level: int) -> str:
+    if level == len(_SPLIT_LEVELS):
+        return tokenizer.truncate(text, max_tokens)
+    parts = re.split(_SPLIT_LEVELS[level], text)  # [piece, sep, piece, sep, ...]
+    kept: list[str] = []
+    used = 0
+    for i in range(0, len(parts), 2):
+        separator = parts[i - 1] if i else ""
+        piece_tokens = tokenizer.count(separator + parts[i])
+        if used + piece_tokens <= max_tokens:
+            kept.append(separator + parts[i])
+            used += piece_tokens
+            continue
+        remaining = max_tokens - used - tokenizer.count(separator)
+        if remaining > 0:
+            partial = _pack(parts[i], remaining, tokenizer, level + 1)
+            if partial:
+                kept.append(separator + partial)
+        break
+    return "".join(kept)
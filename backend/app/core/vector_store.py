@@ -1,22 +1,140 @@
+import hashlib
 import threading
+import time
+from abc import ABC, abstractmethod
 from functools import lru_cache
-from uuid import uuid4
+from typing import Iterator
+from uuid import NAMESPACE_URL, uuid5
 
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
+from qdrant_client.http.exceptions import UnexpectedResponse
 
 from app.config import settings
+from app.core.bm25_index import sparse_terms
 from app.core.embeddings import embed_texts
 
 COLLECTION_NAME = "resume_chunks"
 VECTOR_SIZE = 768  # Alibaba-NLP/gte-base-en-v1.5 dense embedding dimension
 
-# Recruiter batches call upsert_chunks (and therefore ensure_collection) from
-# several concurrent candidate threads. Without this, multiple threads can
+# Recruiter batches call upsert_documents (and therefore ensure_collection)
+# from several concurrent candidate threads. Without this, multiple threads can
 # all see collection_exists() == False on a fresh collection and race to
 # create it, and every loser gets a 409 Conflict from Qdrant.
 _ENSURE_COLLECTION_LOCK = threading.Lock()
 
+# Process-level "collection + payload indexes are ready" cache. Without it,
+# every upsert re-ran collection_exists/get_collection (and possibly
+# create_payload_index) under the lock above, serializing all concurrent
+# round-1 candidates on three network round trips each. Set exactly once on
+# first success; cleared only when Qdrant reports the collection missing
+# (e.g. it was dropped out from under a running process).
+_collection_ready = False
+
+# Namespace for deterministic chunk point IDs (see chunk_point_id).
+_POINT_ID_NAMESPACE = uuid5(NAMESPACE_URL, "job-resume-matcher/resume_chunks")
+
+
+def document_fingerprint(chunks: list[str]) -> str:
+    """Identifies one document's exact stored form: its chunk texts plus the
+    embedding model that produced their vectors (a model change must
+    re-embed even if the text didn't change)."""
+    digest = hashlib.sha256(settings.embedding_model.encode("utf-8"))
+    for chunk in chunks:
+        digest.update(b"\0")
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def chunk_point_id(batch_id: str, filename: str, chunk_index: int, text: str) -> str:
+    """Deterministic point ID from (batch_id, filename, chunk_index, content
+    hash) -- writing the same chunk twice overwrites one point instead of
+    minting a duplicate the way a random uuid4 did."""
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return str(uuid5(_POINT_ID_NAMESPACE, f"{batch_id}\0{filename}\0{chunk_index}\0{content_hash}"))
+
+
+class VectorStoreBackend(ABC):
+    """Durable storage for per-document chunk texts + vectors, addressed by
+    (batch_id, filename). Retrieval-time ranking always runs locally on what
+    `fetch_documents` returns (see `fetch_chunks`), so a backend only has to
+    store, stream back and delete -- no ANN search.
+
+    The bulk methods are the primitives -- a recruiter round touches every
+    candidate in a batch at once -- and the single-document forms are thin
+    wrappers over them. Streamed chunks are dicts with "id", "filename" and
+    "doc_hash" (the document's `document_fingerprint`), plus
+    "text"/"chunk_index" and the chunk's precomputed BM25 terms
+    ("term_ids"/"term_freqs"/"token_count", see app/core/bm25_index.py)
+    when `with_payload`, plus "vector" when
+    `with_vectors` -- an ID-only read (delete, fingerprint checks) or a
+    text-only read never pays for 768-float vectors it doesn't use.
+
+    `upsert_documents` replaces each given document: point IDs come from
+    `chunk_point_id`, so writing the same document twice never duplicates.
+    """
+
+    @abstractmethod
+    def upsert_documents(self, batch_id: str, documents: dict[str, tuple[list[str], np.ndarray]]) -> None: ...
+
+    @abstractmethod
+    def iter_chunks(
+        self, batch_id: str, filenames: list[str], with_vectors: bool = True, with_payload: bool = True
+    ) -> Iterator[dict]: ...
+
+    @abstractmethod
+    def delete(self, batch_id: str, filename: str) -> None: ...
+
+    @abstractmethod
+    def delete_batch(self, batch_id: str) -> None: ...
+
+    @abstractmethod
+    def delete_expired(self, created_before: float, exclude_batch_ids: list[str]) -> None:
+        """Drops every chunk whose `created_at` payload (epoch seconds) is
+        older than `created_before` -- or missing, i.e. written before the
+        field existed -- except chunks of `exclude_batch_ids`."""
+
+    def fetch_documents(
+        self, batch_id: str, filenames: list[str], with_vectors: bool = True, with_payload: bool = True
+    ) -> dict[str, list[dict]]:
+        found: dict[str, list[dict]] = {filename: [] for filename in filenames}
+        if not filenames:
+            return found
+        for chunk in self.iter_chunks(batch_id, filenames, with_vectors=with_vectors, with_payload=with_payload):
+            found.setdefault(chunk["filename"], []).append(chunk)
+        return found
+
+    def document_fingerprints(self, batch_id: str, filenames: list[str]) -> dict[str, set[str]]:
+        """Every fingerprint stored per document -- exactly one for a cleanly
+        indexed document, none if it isn't stored, several only if a write
+        was interrupted halfway (which then never matches, forcing a rewrite)."""
+        found: dict[str, set[str]] = {filename: set() for filename in filenames}
+        if not filenames:
+            return found
+        for chunk in self.iter_chunks(batch_id, filenames, with_vectors=False, with_payload=False):
+            found.setdefault(chunk["filename"], set()).add(chunk.get("doc_hash"))
+        return found
+
+    def upsert(self, batch_id: str, filename: str, chunks: list[str], vectors: np.ndarray) -> None:
+        self.upsert_documents(batch_id, {filename: (chunks, vectors)})
+
+    def fetch(self, batch_id: str, filename: str, with_vectors: bool = True, with_payload: bool = True) -> list[dict]:
+        return self.fetch_documents(batch_id, [filename], with_vectors=with_vectors, with_payload=with_payload)[
+            filename
+        ]
+
+
+_TERM_KEYS = ("term_ids", "term_freqs", "token_count")
+
+# Every payload field used in a filter. created_at drives the TTL sweep
+# (a Range filter), so it needs a numeric index rather than a keyword one.
+_PAYLOAD_INDEXES = {
+    "batch_id": qmodels.PayloadSchemaType.KEYWORD,
+    "filename": qmodels.PayloadSchemaType.KEYWORD,
+    "created_at": qmodels.PayloadSchemaType.FLOAT,
+}
+
 
 @lru_cache
 def get_qdrant_client() -> QdrantClient:
@@ -26,7 +144,12 @@ def get_qdrant_client() -> QdrantClient:
 
 
 def ensure_collection() -> None:
+    global _collection_ready
+    if _collection_ready:
+        return
     with _ENSURE_COLLECTION_LOCK:
+        if _collection_ready:
+            return
         client = get_qdrant_client()
         if not client.collection_exists(COLLECTION_NAME):
             client.create_collection(
@@ -38,85 +161,279 @@ def ensure_collection() -> None:
         # can be used in a filter (scroll/delete) -- create them if missing.
         info = client.get_collection(COLLECTION_NAME)
         existing = set(info.payload_schema.keys()) if info.payload_schema else set()
-        for field in ("batch_id", "filename"):
+        for field, schema in _PAYLOAD_INDEXES.items():
             if field not in existing:
                 client.create_payload_index(
                     collection_name=COLLECTION_NAME,
                     field_name=field,
-                    field_schema=qmodels.PayloadSchemaType.KEYWORD,
+                    field_schema=schema,
                 )
+        _collection_ready = True
+
 
+def invalidate_collection_cache() -> None:
+    global _collection_ready
+    with _ENSURE_COLLECTION_LOCK:
+        _collection_ready = False
 
-def _filter_for(batch_id: str, filename: str) -> qmodels.Filter:
+
+def _with_collection(operation):
+    """Runs a Qdrant operation against the (cached-as-ready) collection. If
+    Qdrant answers 404, the cache was stale -- re-create the collection and
+    indexes once, then retry."""
+    ensure_collection()
+    try:
+        return operation()
+    except UnexpectedResponse as e:
+        if e.status_code != 404:
+            raise
+        invalidate_collection_cache()
+        ensure_collection()
+        return operation()
+
+
+def _filter_for_many(batch_id: str, filenames: list[str]) -> qmodels.Filter:
     return qmodels.Filter(
         must=[
             qmodels.FieldCondition(key="batch_id", match=qmodels.MatchValue(value=batch_id)),
-            qmodels.FieldCondition(key="filename", match=qmodels.MatchValue(value=filename)),
+            qmodels.FieldCondition(key="filename", match=qmodels.MatchAny(any=filenames)),
         ]
     )
 
 
-def upsert_chunks(batch_id: str, filename: str, chunks: list[str]) -> None:
-    """Embeds and durably stores a document's chunks, tagged for later retrieval."""
-    if not chunks:
-        return
-    ensure_collection()
-    client = get_qdrant_client()
-    vectors = embed_texts(chunks)
-    points = [
-        qmodels.PointStruct(
-            id=str(uuid4()),
-            vector=vectors[i].tolist(),
-            payload={
-                "batch_id": batch_id,
-                "filename": filename,
-                "chunk_index": i,
-                "text": chunks[i],
-            },
+class QdrantVectorStore(VectorStoreBackend):
+    """The original, networked backend: one shared Qdrant collection, every
+    point tagged with batch_id/filename payload fields."""
+
+    def upsert_documents(self, batch_id: str, documents: dict[str, tuple[list[str], np.ndarray]]) -> None:
+        client = get_qdrant_client()
+        created_at = time.time()
+        points = []
+        for filename, (chunks, vectors) in documents.items():
+            doc_hash = document_fingerprint(chunks)
+            points.extend(
+                qmodels.PointStruct(
+                    id=chunk_point_id(batch_id, filename, i, chunks[i]),
+                    vector=vectors[i].tolist(),
+                    payload={
+                        "batch_id": batch_id,
+                        "filename": filename,
+                        "chunk_index": i,
+                        "text": chunks[i],
+                        **sparse_terms(chunks[i]),
+                        "doc_hash": doc_hash,
+                        "created_at": created_at,
+                    },
+                )
+                for i in range(len(chunks))
+            )
+        # Sized writes: one request per vector_store_upsert_batch_size points
+        # rather than one per document, without a single unbounded payload
+        # for a batch of hundreds of resumes.
+        batch_size = settings.vector_store_upsert_batch_size
+        for start in range(0, len(points), batch_size):
+            page = points[start : start + batch_size]
+            _with_collection(lambda: client.upsert(collection_name=COLLECTION_NAME, points=page))
+
+    def iter_chunks(
+        self, batch_id: str, filenames: list[str], with_vectors: bool = True, with_payload: bool = True
+    ) -> Iterator[dict]:
+        """Streams every chunk of the requested documents through one
+        filtered scroll (MatchAny over filenames), following Qdrant's
+        next-page offset until it's exhausted -- a long document is never
+        silently cut off at one page. Without `with_payload`, only the
+        filename/doc_hash payload keys are transferred (needed to group
+        results and to check fingerprints)."""
+        if not filenames:
+            return
+        client = get_qdrant_client()
+        payload_selector = True if with_payload else ["filename", "doc_hash"]
+        offset = None
+        while True:
+            points, offset = _with_collection(
+                lambda: client.scroll(
+                    collection_name=COLLECTION_NAME,
+                    scroll_filter=_filter_for_many(batch_id, filenames),
+                    limit=settings.vector_store_scroll_page_size,
+                    offset=offset,
+                    with_vectors=with_vectors,
+                    with_payload=payload_selector,
+                )
+            )
+            for p in points:
+                chunk = {"id": p.id, "filename": p.payload["filename"], "doc_hash": p.payload.get("doc_hash")}
+                if with_payload:
+                    chunk["text"] = p.payload["text"]
+                    chunk["chunk_index"] = p.payload["chunk_index"]
+                    if "term_ids" in p.payload:
+                        chunk.update({key: p.payload[key] for key in _TERM_KEYS})
+                if with_vectors:
+                    chunk["vector"] = p.vector
+                yield chunk
+            if offset is None:
+                return
+
+    def delete(self, batch_id: str, filename: str) -> None:
+        """Deletes by explicit point ID (via an ID-only scroll) rather than by filter --
+        a filter-based delete depends on the batch_id/filename payload index
+        being fully caught up, which can lag just after the index is first
+        created on a fresh collection. Point-ID deletion is a direct
+        primary-key operation and has no such window.
+        """
+        client = get_qdrant_client()
+        if not _collection_ready and not client.collection_exists(COLLECTION_NAME):
+            return
+        point_ids = [c["id"] for c in self.iter_chunks(batch_id, [filename], with_vectors=False, with_payload=False)]
+        if not point_ids:
+            return
+        _with_collection(
+            lambda: client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=qmodels.PointIdsList(points=point_ids),
+            )
+        )
+
+    def delete_batch(self, batch_id: str) -> None:
+        """One filter-based delete for a whole batch. Unlike `delete`, this
+        only ever runs once a job is finished -- long after the batch_id
+        payload index was created -- so the fresh-index lag doesn't apply."""
+        client = get_qdrant_client()
+        if not _collection_ready and not client.collection_exists(COLLECTION_NAME):
+            return
+        _with_collection(
+            lambda: client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=qmodels.FilterSelector(
+                    filter=qmodels.Filter(
+                        must=[qmodels.FieldCondition(key="batch_id", match=qmodels.MatchValue(value=batch_id))]
+                    )
+                ),
+            )
+        )
+
+    def delete_expired(self, created_before: float, exclude_batch_ids: list[str]) -> None:
+        client = get_qdrant_client()
+        if not _collection_ready and not client.collection_exists(COLLECTION_NAME):
+            return
+        must_not = (
+            [qmodels.FieldCondition(key="batch_id", match=qmodels.MatchAny(any=exclude_batch_ids))]
+            if exclude_batch_ids
+            else None
+        )
+        _with_collection(
+            lambda: client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=qmodels.FilterSelector(
+                    filter=qmodels.Filter(
+                        # Points written before created_at existed have no
+                        # age at all -- they can only be orphans by now.
+                        should=[
+                            qmodels.FieldCondition(key="created_at", range=qmodels.Range(lt=created_before)),
+                            qmodels.IsEmptyCondition(is_empty=qmodels.PayloadField(key="created_at")),
+                        ],
+                        must_not=must_not,
+                    )
+                ),
+            )
         )
-        for i in range(len(chunks))
-    ]
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
 
 
-def fetch_chunks(batch_id: str, filename: str) -> list[dict]:
+@lru_cache
+def get_vector_store() -> VectorStoreBackend:
+    # "local" keeps everything in-process (see local_vector_store.py) -- a
+    # single-node deployment or a test run needs no Qdrant server at all.
+    if settings.vector_store_backend == "local":
+        from app.core.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(settings.local_vector_store_dir)
+    if settings.vector_store_backend == "qdrant":
+        return QdrantVectorStore()
+    raise ValueError(f"Unknown vector_store_backend: {settings.vector_store_backend!r}")
+
+
+def upsert_documents(
+    batch_id: str, documents: dict[str, list[str]], vectors: dict[str, np.ndarray] | None = None
+) -> list[str]:
+    """Embeds and durably stores documents' chunks, tagged for later
+    retrieval. Every document's chunks are embedded in ONE `embed_texts`
+    call and written in sized batches, so indexing a whole recruiter batch
+    costs O(1) store requests instead of one per resume.
+
+    Idempotent: a document whose stored fingerprint already matches is
+    skipped outright -- re-submitting the same resume costs one ID-only
+    fingerprint read instead of a re-embed and re-upload. A document stored
+    with a different fingerprint is deleted first, so a shorter revision
+    never leaves stale trailing chunks behind. Returns the filenames that
+    were actually (re)written.
+
+    `vectors` supplies already-computed chunk embeddings per filename (see
+    app/services/document_index.py); only documents missing from it are
+    embedded here.
+    """
+    documents = {filename: chunks for filename, chunks in documents.items() if chunks}
+    if not documents:
+        return []
+    store = get_vector_store()
+    stored = store.document_fingerprints(batch_id, list(documents))
+    changed: dict[str, list[str]] = {}
+    for filename, chunks in documents.items():
+        if stored.get(filename) == {document_fingerprint(chunks)}:
+            continue
+        if stored.get(filename):
+            store.delete(batch_id, filename)
+        changed[filename] = chunks
+    documents = changed
+    if not documents:
+        return []
+    vectors = vectors or {}
+    to_embed = [chunk for filename, chunks in documents.items() if filename not in vectors for chunk in chunks]
+    embedded = embed_texts(to_embed) if to_embed else None
+    split: dict[str, tuple[list[str], np.ndarray]] = {}
+    start = 0
+    for filename, chunks in documents.items():
+        if filename in vectors:
+            split[filename] = (chunks, vectors[filename])
+            continue
+        split[filename] = (chunks, embedded[start : start + len(chunks)])
+        start += len(chunks)
+    store.upsert_documents(batch_id, split)
+    return list(split)
+
+
+def fetch_chunks(batch_id: str, filename: str, with_vectors: bool = True) -> list[dict]:
     """Returns every stored chunk (text + vector) for one document.
 
     Retrieval-time ranking (BM25 + dense fusion + rerank) runs locally against
-    this small, per-document set rather than issuing a Qdrant ANN query --
-    Qdrant's job here is durable storage, not runtime search, since a single
-    resume is only a few dozen chunks.
+    this small, per-document set rather than issuing an ANN query against the
+    backend -- the store's job here is durable storage, not runtime search,
+    since a single resume is only a few dozen chunks. Text-only consumers
+    pass `with_vectors=False`.
     """
-    client = get_qdrant_client()
-    points, _ = client.scroll(
-        collection_name=COLLECTION_NAME,
-        scroll_filter=_filter_for(batch_id, filename),
-        limit=1000,
-        with_vectors=True,
-        with_payload=True,
-    )
-    return [
-        {"id": p.id, "text": p.payload["text"], "chunk_index": p.payload["chunk_index"], "vector": p.vector}
-        for p in points
-    ]
+    return get_vector_store().fetch(batch_id, filename, with_vectors=with_vectors)
+
+
+def fetch_documents(batch_id: str, filenames: list[str], with_vectors: bool = True) -> dict[str, list[dict]]:
+    """Bulk form of `fetch_chunks`: every requested document's chunks in one
+    paginated read. Every filename is present in the result (empty list if
+    nothing is stored for it)."""
+    return get_vector_store().fetch_documents(batch_id, filenames, with_vectors=with_vectors)
 
 
 def delete_document(batch_id: str, filename: str) -> None:
-    """Removes a document's chunks -- used for ephemeral (job-seeker) uploads.
+    """Removes a document's chunks -- used for ephemeral (job-seeker) uploads."""
+    get_vector_store().delete(batch_id, filename)
 
-    Deletes by explicit point ID (via fetch_chunks) rather than by filter --
-    a filter-based delete depends on the batch_id/filename payload index being
-    fully caught up, which can lag just after the index is first created on a
-    fresh collection. Point-ID deletion is a direct primary-key operation and
-    has no such window.
-    """
-    client = get_qdrant_client()
-    if not client.collection_exists(COLLECTION_NAME):
-        return
-    chunks = fetch_chunks(batch_id, filename)
-    if not chunks:
-        return
-    client.delete(
-        collection_name=COLLECTION_NAME,
-        points_selector=qmodels.PointIdsList(points=[c["id"] for c in chunks]),
-    )
+
+def delete_batch(batch_id: str) -> None:
+    """Removes every chunk of a whole batch in one call -- recruiter batches
+    are dropped this way once their job reaches a terminal state."""
+    get_vector_store().delete_batch(batch_id)
+
+
+def sweep_expired_batches(exclude_batch_ids: list[str] | None = None) -> None:
+    """TTL backstop for batches whose job never reached a terminal state
+    cleanly (a crash or restart mid-job leaves its chunks orphaned). Batches
+    still in use by a live job are passed in `exclude_batch_ids` so a long
+    pause awaiting approval never loses its chunks."""
+    cutoff = time.time() - settings.vector_batch_ttl_hours * 3600
+    get_vector_store().delete_expired(cutoff, exclude_batch_ids or [])
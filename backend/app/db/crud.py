@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db.models import AnalysisReport, ProjectCandidate, RecruitmentProject, Resume
+from app.db.models import AnalysisReport, ProjectCandidate, RecruitmentProject, Resume, RubricVerdictCache
 from app.models.schemas import CandidateResult, JobSeekerAnalysisResponse
 
 
@@ -161,3 +161,19 @@ def list_project_candidates(db: Session, project_id: str) -> list[ProjectCandida
             .order_by(ProjectCandidate.overall_fit_score.desc())
         )
     )
+
+
+def get_cached_verdicts(db: Session, cache_keys: list[str]) -> dict[str, dict]:
+    if not cache_keys:
+        return {}
+    rows = db.scalars(select(RubricVerdictCache).where(RubricVerdictCache.cache_key.in_(cache_keys)))
+    return {row.cache_key: row.verdict_json for row in rows}
+
+
+def save_cached_verdicts(db: Session, model: str, verdicts: dict[str, dict]) -> None:
+    # merge() rather than add(): the same key can legitimately be written
+    # twice (two candidates with an identical requirement + evidence set
+    # finishing concurrently) -- last write wins, both are equally valid.
+    for cache_key, verdict_json in verdicts.items():
+        db.merge(RubricVerdictCache(cache_key=cache_key, model=model, verdict_json=verdict_json))
+    db.commit()
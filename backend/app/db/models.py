@@ -87,3 +87,17 @@ class ProjectCandidate(Base):
     shortlisted: Mapped[bool] = mapped_column(Boolean, default=False)
     round_reached: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+
+
+class RubricVerdictCache(Base):
+    """Memoized rubric verdicts, keyed by a canonical hash of everything the
+    rubric call sees for one requirement (see app/services/verdict_cache.py)
+    -- a retry, stop-and-resume or duplicate upload re-asks identical
+    questions, and each answer costs a quota-limited LLM call."""
+
+    __tablename__ = "rubric_verdict_cache"
+
+    cache_key: Mapped[str] = mapped_column(String, primary_key=True)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    verdict_json: Mapped[dict] = mapped_column(JSON, nullable=False)  # RequirementVerdictCore fields
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
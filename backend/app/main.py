@@ -1,11 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import job_seeker, recruiter
+from app.config import settings
+from app.core.app_logging import recruiter_logger
+from app.core.embeddings import embedding_cache_stats
+from app.core.gpu_lock import gpu_scheduler_stats
+from app.core.rate_limit import rate_limit_stats
+from app.core.tokenizers import tokenizer_stats
+from app.core.vector_store import sweep_expired_batches
 from app.db.models import Base
 from app.db.session import engine
+from app.services import job_store
+from app.services.document_index import document_index_stats
+from app.services.rag_matching import evidence_cache_stats
+from app.services.rubric_batcher import rubric_batching_stats
+
+
+async def _sweep_expired_batches_forever() -> None:
+    # Recruiter batches are dropped as soon as their job finishes; this only
+    # catches what that misses (a crash or restart mid-job), so a coarse
+    # interval is plenty.
+    while True:
+        await asyncio.sleep(settings.vector_batch_sweep_interval_seconds)
+        try:
+            await asyncio.to_thread(sweep_expired_batches, job_store.live_batch_ids())
+        except Exception:
+            recruiter_logger.warning("Vector batch TTL sweep failed", exc_info=True)
+
 
-app = FastAPI(title="AI Resume & Job Matcher API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    sweeper = asyncio.create_task(_sweep_expired_batches_forever())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+
+
+app = FastAPI(title="AI Resume & Job Matcher API", version="0.1.0", lifespan=lifespan)
 
 # create_all only ever adds missing tables -- never touches existing ones --
 # so this is safe to run on every startup instead of hand-rolling migrations
@@ -26,3 +62,16 @@ app.include_router(recruiter.router)
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+def metrics() -> dict:
+    return {
+        "embedding_cache": embedding_cache_stats(),
+        "document_index": document_index_stats(),
+        "evidence_cache": evidence_cache_stats(),
+        "gpu_scheduler": gpu_scheduler_stats(),
+        "rate_limits": rate_limit_stats(),
+        "tokenizers": tokenizer_stats(),
+        "rubric_batching": rubric_batching_stats(),
+    }
@@ -1,4 +1,4 @@
-from app.core.llm import call_structured
+from app.core.llm import call_structured_async
 from app.models.schemas import ContactInfo
 
 _CONTACT_SYSTEM = (
@@ -8,14 +8,14 @@ _CONTACT_SYSTEM = (
 )
 
 
-def extract_contact_info(resume_text: str, model: str | None = None) -> ContactInfo:
+async def extract_contact_info_async(resume_text: str, model: str | None = None) -> ContactInfo:
     """One lightweight, decoupled call per round-3 candidate -- same pattern as
     `_suggest_certifications`: a lower-stakes convenience field that shouldn't
     share a call (or a failure) with the actual rubric scoring, and doesn't
     need the rubric check's heavier three-tier fallback chain since a missed
     contact field just means the recruiter fills it in manually.
     """
-    return call_structured(
+    return await call_structured_async(
         system=_CONTACT_SYSTEM,
         user=(
             "Extract this candidate's full name, email address, and phone number from the resume "
@@ -0,0 +1,151 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from app.config import settings
+from app.core.bm25_index import sparse_terms
+from app.core.embeddings import embed_texts
+from app.services.chunking import chunk_text
+
+
+@dataclass(frozen=True)
+class IndexedDocument:
+    """One extracted text's chunks, their (read-only) embedding rows and
+    their BM25 sparse terms -- everything indexing produces before anything
+    is written to a batch."""
+
+    key: str
+    chunks: tuple[str, ...]
+    vectors: np.ndarray
+    terms: tuple[dict, ...] = ()
+
+
+@dataclass
+class _Entry:
+    document: IndexedDocument
+    # batch_ids currently referencing this document -- a set rather than a
+    # counter so re-indexing the same resume into the same batch can't
+    # inflate the refcount past what a single release undoes.
+    batches: set[str] = field(default_factory=set)
+
+
+def document_key(text: str) -> str:
+    """Content address of a document's indexed form: the extracted text plus
+    everything that shapes its chunks and vectors, so a chunking or model
+    change never serves stale entries."""
+    digest = hashlib.sha256(
+        f"{settings.embedding_model}\0{settings.chunk_size}\0{settings.chunk_overlap}\0".encode("utf-8")
+    )
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DocumentIndex:
+    """Content-addressed store of chunked + embedded documents, shared
+    across batches.
+
+    Recruiters re-upload the same resumes into a project across batch runs,
+    and job seekers re-analyze one library resume against many JDs -- each
+    time the same text was re-chunked and every chunk looked up (or
+    re-embedded) again. Here the second `acquire` of the same text is a dict
+    hit. Entries referenced by a live batch are pinned; once every batch has
+    released one, it becomes evictable, least-recently-used first, once the
+    index holds more than `max_entries` documents.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire_many(self, batch_id: str, texts: list[str]) -> list[IndexedDocument]:
+        """Returns each text's indexed form, referenced by `batch_id`. Only
+        texts not already indexed are chunked, and all of their chunks go
+        through one `embed_texts` call."""
+        keys = [document_key(text) for text in texts]
+        found: dict[str, IndexedDocument] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.batches.add(batch_id)
+                    found[key] = entry.document
+                    self.hits += 1
+
+        missing: dict[str, list[str]] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = chunk_text(text)
+        if missing:
+            all_chunks = [chunk for chunks in missing.values() for chunk in chunks]
+            vectors = np.asarray(embed_texts(all_chunks), dtype=np.float32) if all_chunks else None
+            start = 0
+            built: dict[str, IndexedDocument] = {}
+            for key, chunks in missing.items():
+                rows = (
+                    np.ascontiguousarray(vectors[start : start + len(chunks)])
+                    if chunks
+                    else np.empty((0, 0), dtype=np.float32)
+                )
+                rows.setflags(write=False)
+                built[key] = IndexedDocument(
+                    key=key, chunks=tuple(chunks), vectors=rows, terms=tuple(sparse_terms(c) for c in chunks)
+                )
+                start += len(chunks)
+            with self._lock:
+                self.misses += len(built)
+                for key, document in built.items():
+                    # Another thread may have indexed the same text meanwhile
+                    # -- keep whichever landed first, so references agree.
+                    entry = self._entries.setdefault(key, _Entry(document=document))
+                    entry.batches.add(batch_id)
+                    found[key] = entry.document
+                self._evict()
+        return [found[key] for key in keys]
+
+    def release(self, batch_id: str) -> None:
+        """Drops `batch_id`'s references; its documents stay cached (and may
+        be reused by the next batch) until evicted."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.batches.discard(batch_id)
+            self._evict()
+
+    def _evict(self) -> None:
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            return
+        # Pinned entries are skipped, so the bound is soft while many
+        # batches are live at once.
+        for key in [k for k, e in self._entries.items() if not e.batches][:overflow]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "pinned": sum(1 for e in self._entries.values() if e.batches),
+                "max_entries": self.max_entries,
+            }
+
+
+@lru_cache
+def get_document_index() -> DocumentIndex:
+    return DocumentIndex(settings.document_index_max_entries)
+
+
+def release_batch_documents(batch_id: str) -> None:
+    get_document_index().release(batch_id)
+
+
+def document_index_stats() -> dict:
+    return get_document_index().stats()
@@ -2,20 +2,26 @@ from typing import Callable
 from uuid import uuid4
 
 from app.core.app_logging import job_seeker_logger, set_current_logger
-from app.core.llm import call_llm
+from app.core.bm25_index import drop_batch_corpus
+from app.core.llm import call_llm_async
+from app.core.llm_loop import run_on_llm_loop
 from app.core.vector_store import delete_document
 from app.models.schemas import (
     DegreeInfo,
     EligibilityResult,
     JobSeekerAnalysisResponse,
+    OptimizedResume,
     RequirementVerdict,
+    RubricResult,
 )
 from app.services.degree_extractor import extract_degrees
+from app.services.document_index import release_batch_documents
 from app.services.exp_extractor import extract_experience
 from app.services.matching import calculate_overall_fit_score
-from app.services.rag_matching import match_resume_to_requirements
+from app.services.rag_matching import index_document, match_resume_to_requirements_async
 from app.services.resume_optimizer import optimize_and_verify
-from app.services.skill_extractor import extract_weighted_skills_from_jd
+from app.services.skill_extractor import extract_weighted_skills_from_jd_async
+from app.services.stage_scheduler import Stage, run_stages
 
 _DEGREE_RANKING = {"diploma": 1, "associate": 2, "bachelor": 3, "master": 4, "phd": 5}
 
@@ -100,27 +106,95 @@ def analyze_job_seeker(
     batch_id = str(uuid4())
     filename = "resume"
 
-    notify("requirements", "running")
-    jd_skill_weights = extract_weighted_skills_from_jd(job_desc_text, job_role)
-    job_seeker_logger.debug("analyze_job_seeker jd_skill_weights=%r", jd_skill_weights)
-    publish(jd_requirements=[{"requirement": k, "weight": v} for k, v in jd_skill_weights.items()])
-    notify("requirements", "done")
-
-    try:
-        rubric = match_resume_to_requirements(
+    # Everything after eligibility runs as a stage graph (app/services/
+    # stage_scheduler.py), each stage starting as soon as its inputs exist:
+    #
+    #   requirements ──┐
+    #                  ├─> retrieval ──> scoring
+    #   indexing ──────┘
+    #   overall_fit, cover_letter, improvements   (resume + JD only)
+    #
+    # so the resume is chunked and embedded while the JD's requirements are
+    # still being extracted, and the cover letter and optimized resume --
+    # which never looked at the verdicts -- are written alongside the
+    # rubric. The whole analysis takes as long as its longest chain rather
+    # than the sum of every stage. Each named stage reports running/done
+    # through `on_stage` itself, in whatever order they actually happen.
+    #
+    # Stopping: the rubric still checks `should_stop` per batch (see
+    # `evaluate_rubric`). The cover letter and improvements, though, no
+    # longer wait for the rubric -- they have no inputs to wait on, so they
+    # start with the graph and are only skipped if the stop came in before
+    # that (during eligibility). A stop requested mid-rubric no longer
+    # cancels them as it did when they ran last: they finish, are published
+    # and are kept. That's the price of overlapping them with the rubric --
+    # an in-flight Groq call can't be interrupted anyway.
+    async def requirements() -> dict[str, float]:
+        jd_skill_weights = await extract_weighted_skills_from_jd_async(job_desc_text, job_role)
+        job_seeker_logger.debug("analyze_job_seeker jd_skill_weights=%r", jd_skill_weights)
+        publish(jd_requirements=[{"requirement": k, "weight": v} for k, v in jd_skill_weights.items()])
+        return jd_skill_weights
+
+    def indexing() -> None:
+        index_document(batch_id, filename, resume_text)
+
+    async def score_rubric(requirements: dict[str, float], indexing: None) -> RubricResult:
+        # Reports the "retrieval" and "scoring" stages itself.
+        return await match_resume_to_requirements_async(
             batch_id,
             filename,
-            resume_text,
-            jd_skill_weights,
+            requirements,
             on_stage=on_stage,
             on_activity=on_activity,
             on_verdict=on_verdict,
             should_stop=should_stop,
         )
+
+    async def cover_letter() -> str:
+        letter = await call_llm_async(
+            system="You are an expert career writing assistant.",
+            user=_COVER_LETTER_PROMPT.format(resume_text=resume_text, job_desc_text=job_desc_text),
+        )
+        publish(cover_letter=letter)
+        return letter
+
+    def improvements() -> OptimizedResume:
+        optimized = optimize_and_verify(resume_text, job_desc_text)
+        publish(optimized_resume=optimized)
+        return optimized
+
+    try:
+        results = run_on_llm_loop(
+            run_stages(
+                [
+                    Stage("requirements", requirements, stoppable=False, reported=True),
+                    Stage("indexing", indexing, stoppable=False, reported=True),
+                    Stage("rubric", score_rubric, ("requirements", "indexing"), stoppable=False),
+                    Stage(
+                        "overall_fit",
+                        lambda: calculate_overall_fit_score(resume_text, job_desc_text),
+                        stoppable=False,
+                    ),
+                    Stage("cover_letter", cover_letter, reported=True),
+                    Stage("improvements", improvements, reported=True),
+                ],
+                on_stage=on_stage,
+                should_stop=should_stop,
+            )
+        )
     finally:
         delete_document(batch_id, filename)
-
-    overall_fit_score = calculate_overall_fit_score(resume_text, job_desc_text)
+        # The chunked + embedded resume stays in the document index, so the
+        # next analysis of this same resume (against another JD) skips
+        # chunking and embedding.
+        release_batch_documents(batch_id)
+        drop_batch_corpus(batch_id)
+
+    jd_skill_weights = results["requirements"]
+    rubric = results["rubric"]
+    overall_fit_score = results["overall_fit"]
+    cover_letter = results.get("cover_letter")
+    optimized_resume = results.get("improvements")
 
     total_weight = sum(jd_skill_weights.values())
     satisfied_weight = sum(v.weight for v in rubric.verdicts if v.satisfied)
@@ -129,25 +203,6 @@ def analyze_job_seeker(
     matched_requirements = [v.requirement for v in rubric.verdicts if v.satisfied]
     missing_requirements = [v.requirement for v in rubric.verdicts if not v.satisfied]
 
-    # Cover letter and improvements are separate Groq calls after rubric
-    # scoring -- if stop was requested mid-rubric, skip them too rather than
-    # starting fresh work after the user already asked to stop.
-    cover_letter = None
-    optimized_resume = None
-    if not (should_stop and should_stop()):
-        notify("cover_letter", "running")
-        cover_letter = call_llm(
-            system="You are an expert career writing assistant.",
-            user=_COVER_LETTER_PROMPT.format(resume_text=resume_text, job_desc_text=job_desc_text),
-        )
-        publish(cover_letter=cover_letter)
-        notify("cover_letter", "done")
-
-        notify("improvements", "running")
-        optimized_resume = optimize_and_verify(resume_text, job_desc_text)
-        publish(optimized_resume=optimized_resume)
-        notify("improvements", "done")
-
     job_seeker_logger.info(
         "=== analyze_job_seeker END overall_fit_score=%.1f skill_based_ats_score=%.1f matched=%d missing=%d ===",
         overall_fit_score,
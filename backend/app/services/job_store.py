@@ -2,9 +2,11 @@ import threading
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 from uuid import uuid4
 
+from app.core.app_logging import get_logger
+
 
 class JobState(str, Enum):
     QUEUED = "queued"
@@ -72,12 +74,39 @@ class Job:
     # candidates without threading project_id through PipelineState/
     # recruiter_service (which stay DB-agnostic).
     project_id: str | None = None
+    # Vector-store batch holding this job's resume chunks (recruiter only).
+    # Kept here rather than only on pipeline_state, which is cleared on every
+    # terminal transition -- terminal listeners need it to drop the batch.
+    batch_id: str | None = None
+
 
+_TERMINAL_STATES = (JobState.COMPLETED, JobState.FAILED, JobState.STOPPED)
 
 # In-memory only -- fine for a single-process personal project; jobs are
 # lost on restart, which is an acceptable trade-off here.
 _jobs: dict[str, Job] = {}
 _lock = threading.Lock()
+_terminal_listeners: list[Callable[[Job], None]] = []
+
+
+def add_terminal_listener(listener: Callable[[Job], None]) -> None:
+    """Registers `listener(job)` to run once a job reaches COMPLETED, FAILED
+    or STOPPED. Called outside the store's lock and on whatever thread made
+    the transition, so listeners must be quick (hand slow work off) and must
+    not raise into the job's own error handling."""
+    _terminal_listeners.append(listener)
+
+
+def _notify_terminal(job: Job | None) -> None:
+    if job is None:
+        return
+    for listener in _terminal_listeners:
+        try:
+            listener(job)
+        except Exception:
+            # Never into the job's own error handling -- but never silently
+            # either: a failed cleanup listener leaks whatever it was dropping.
+            get_logger().exception("Terminal listener %r failed for job %s", listener, job.id)
 
 
 def create_job(
@@ -85,8 +114,9 @@ def create_job(
     stage_defs: list[tuple[str, str]] | None = None,
     candidate_names: list[str] | None = None,
     project_id: str | None = None,
+    batch_id: str | None = None,
 ) -> Job:
-    job = Job(id=str(uuid4()), kind=kind, project_id=project_id)
+    job = Job(id=str(uuid4()), kind=kind, project_id=project_id, batch_id=batch_id)
     if stage_defs:
         job.stages = [StageProgress(key=k, label=label) for k, label in stage_defs]
     if candidate_names:
@@ -164,6 +194,7 @@ def set_result(job_id: str, result: Any) -> None:
             job.pending_approval = None
             job.pipeline_state = None
             job.next_round = None
+    _notify_terminal(job)
 
 
 def set_error(job_id: str, error: str) -> None:
@@ -172,6 +203,7 @@ def set_error(job_id: str, error: str) -> None:
         if job:
             job.error = error
             job.state = JobState.FAILED
+    _notify_terminal(job)
 
 
 def set_awaiting_approval(job_id: str, next_round: int, pipeline_state: Any, pending_approval: Any) -> None:
@@ -192,7 +224,7 @@ def request_stop(job_id: str) -> bool:
         job = _jobs.get(job_id)
         if not job:
             return False
-        if job.state in (JobState.COMPLETED, JobState.FAILED, JobState.STOPPED):
+        if job.state in _TERMINAL_STATES:
             return False
         job.stop_requested = True
         return True
@@ -213,6 +245,7 @@ def set_stopped(job_id: str, result: Any = None) -> None:
             job.pending_approval = None
             job.pipeline_state = None
             job.next_round = None
+    _notify_terminal(job)
 
 
 def take_pipeline_state(job_id: str) -> tuple[int | None, Any]:
@@ -228,3 +261,10 @@ def take_pipeline_state(job_id: str) -> tuple[int | None, Any]:
         job.next_round = None
         job.pipeline_state = None
         return next_round, pipeline_state
+
+
+def live_batch_ids() -> list[str]:
+    """Vector-store batches still owned by a non-terminal job -- the TTL
+    sweep must never touch these, however long a job sits awaiting approval."""
+    with _lock:
+        return [job.batch_id for job in _jobs.values() if job.batch_id and job.state not in _TERMINAL_STATES]
@@ -1,63 +1,231 @@
+import asyncio
 import datetime as dt
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Callable
 
+import httpx
 import numpy as np
-import requests
 from google import genai
 from google.genai import types as genai_types
 from pydantic import BaseModel
-from rank_bm25 import BM25Okapi
 
 from app.config import settings
 from app.core.app_logging import get_logger
+from app.core.bm25_index import CorpusStats, add_to_batch_corpus, batch_corpus, bm25_scores, chunk_terms, tokenize
+from app.core.cache import LRUCache
 from app.core.embeddings import embed_texts
-from app.core.llm import call_llm, call_structured
-from app.core.reranker import rerank
-from app.core.vector_store import fetch_chunks, upsert_chunks
+from app.core.llm import call_llm_async, call_structured_async, estimate_tokens
+from app.core.llm_loop import on_llm_loop, run_on_llm_loop
+from app.core.rate_limit import admitted, get_provider_limiter, wait_for_capacity
+from app.core.reranker import rerank_many
+from app.core.vector_store import document_fingerprint, fetch_chunks, fetch_documents, upsert_documents
 from app.models.schemas import (
     CertificationSuggestionList,
     RequirementVerdict,
     RubricResult,
     RubricResultCore,
 )
-from app.services.chunking import chunk_text
-
-
-def _tokenize(text: str) -> list[str]:
-    return re.findall(r"[a-z0-9]+", text.lower())
+from app.services.document_index import get_document_index
+from app.services.rubric_batcher import RubricBatchPlanner, get_tier_batch_limit, record_batch_outcome
+from app.services.verdict_cache import load_verdicts, rubric_model_id, store_verdicts, verdict_cache_key
 
 
 def _ranks_from_scores(scores: np.ndarray) -> np.ndarray:
-    """Rank 0 = best. Ties broken by original order."""
-    order = np.argsort(-scores, kind="stable")
+    """Row-wise ranks of a (queries x items) score matrix -- rank 0 = best,
+    ties broken by original order. One batched argsort for every row."""
+    order = np.argsort(-scores, axis=1, kind="stable")
     ranks = np.empty_like(order)
-    ranks[order] = np.arange(len(scores))
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1])[None, :], axis=1)
     return ranks
 
 
+def reciprocal_rank_fusion(
+    dense_scores: np.ndarray, lexical_scores: np.ndarray, rrf_k: int, top_n: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """RRF over (requirements x chunks) dense and BM25 score matrices, every
+    requirement at once: one batched argsort per signal for ranks, then
+    `argpartition` for each row's `top_n` fused candidates (only those few
+    get fully sorted). Returns (fused scores, top indices per row, best
+    first) -- cost scales with matrix size, not requirement count.
+    """
+    fused = 1.0 / (rrf_k + _ranks_from_scores(dense_scores) + 1) + 1.0 / (
+        rrf_k + _ranks_from_scores(lexical_scores) + 1
+    )
+    n_items = fused.shape[1]
+    top_n = min(top_n, n_items)
+    if top_n <= 0:
+        return fused, np.empty((fused.shape[0], 0), dtype=np.intp)
+    if top_n < n_items:
+        top = np.argpartition(-fused, top_n - 1, axis=1)[:, :top_n]
+    else:
+        top = np.broadcast_to(np.arange(n_items), fused.shape)
+    top_scores = np.take_along_axis(fused, top, axis=1)
+    # Best first; equal fused scores keep chunk order for determinism.
+    order = np.lexsort((top, -top_scores), axis=1)
+    return fused, np.take_along_axis(top, order, axis=1)
+
+
+@dataclass(frozen=True)
+class RequirementMatrix:
+    """A JD's requirements embedded once, as a frozen (requirements x dim)
+    L2-normalized matrix plus its weight vector. Built once per recruiter
+    pipeline (see `PipelineState.requirement_matrix`) so rounds 1-3 stop
+    re-embedding the same requirement strings for every candidate.
+    """
+
+    requirements: tuple[str, ...]
+    vectors: np.ndarray
+    weights: np.ndarray
+
+    def vectors_for(self, requirements: list[str]) -> np.ndarray:
+        """Rows for `requirements`, in that order. Anything not in this
+        matrix (shouldn't normally happen) is embedded on the spot."""
+        row_of = {req: i for i, req in enumerate(self.requirements)}
+        unknown = [req for req in requirements if req not in row_of]
+        extra = embed_texts(unknown) if unknown else None
+        extra_row = {req: i for i, req in enumerate(unknown)}
+        return np.vstack(
+            [self.vectors[row_of[req]] if req in row_of else extra[extra_row[req]] for req in requirements]
+        )
+
+
+def build_requirement_matrix(jd_skill_weights: dict[str, float]) -> RequirementMatrix:
+    requirements = tuple(jd_skill_weights.keys())
+    if requirements:
+        vectors = np.asarray(embed_texts(list(requirements)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+    else:
+        vectors = np.empty((0, 0), dtype=np.float32)
+    weights = np.array([jd_skill_weights[req] for req in requirements], dtype=np.float32)
+    vectors = np.ascontiguousarray(vectors)
+    vectors.setflags(write=False)
+    weights.setflags(write=False)
+    return RequirementMatrix(requirements=requirements, vectors=vectors, weights=weights)
+
+
 def index_document(batch_id: str, filename: str, text: str) -> int:
     """Chunks a document and durably stores its embeddings. Returns chunk count."""
-    logger = get_logger()
-    logger.debug(
-        "index_document filename=%s text_len=%d raw_text=%r", filename, len(text), text
-    )
-    chunks = chunk_text(text)
-    logger.debug("index_document filename=%s chunk_count=%d chunks=%r", filename, len(chunks), chunks)
-    upsert_chunks(batch_id, filename, chunks)
-    return len(chunks)
+    return index_documents(batch_id, {filename: text})[filename]
+
+
+def index_documents(batch_id: str, texts: dict[str, str]) -> dict[str, int]:
+    """Bulk form of `index_document`: resolves every text through the
+    content-addressed document index (chunking + embedding only texts it
+    hasn't seen), then stores all of their chunks through one
+    `upsert_documents` call. Returns each document's chunk count.
 
+    Every document's chunk terms also feed the batch's BM25 corpus (see
+    `add_to_batch_corpus`), so lexical scoring sees batch-wide IDF.
 
-def estimate_provisional_score(
+    The batch keeps its documents referenced until
+    `release_batch_documents(batch_id)` -- callers release once the batch's
+    vector-store chunks are deleted.
+    """
+    logger = get_logger()
+    filenames = list(texts)
+    documents = get_document_index().acquire_many(batch_id, [texts[f] for f in filenames])
+    for filename, document in zip(filenames, documents):
+        logger.debug(
+            "index_document filename=%s text_len=%d raw_text=%r", filename, len(texts[filename]), texts[filename]
+        )
+        logger.debug(
+            "index_document filename=%s doc_key=%s chunk_count=%d chunks=%r",
+            filename,
+            document.key[:12],
+            len(document.chunks),
+            document.chunks,
+        )
+    upsert_documents(
+        batch_id,
+        {filename: list(document.chunks) for filename, document in zip(filenames, documents)},
+        vectors={filename: document.vectors for filename, document in zip(filenames, documents) if document.chunks},
+    )
+    add_to_batch_corpus(batch_id, {filename: list(document.terms) for filename, document in zip(filenames, documents)})
+    return {filename: len(document.chunks) for filename, document in zip(filenames, documents)}
+
+
+def score_candidates_against_requirements(
+    requirement_vectors: np.ndarray,
+    weights: np.ndarray,
+    candidate_vectors: list[np.ndarray],
+    floor: float,
+    ceiling: float,
+) -> np.ndarray:
+    """Scores many candidates against one (requirements x dim) requirement
+    matrix in a single pass: every candidate's vectors are stacked into one
+    matrix, one matrix product gives every requirement's cosine against
+    every row, and `np.maximum.reduceat` takes each candidate's best row per
+    requirement -- a few BLAS calls regardless of candidate count, instead of
+    a Python loop per candidate per requirement.
+
+    Best similarity per requirement is calibrated into 0-1 via
+    `floor`/`ceiling` (see `estimate_provisional_scores`) and combined as a
+    weight-averaged 0-100 score. A candidate with no vectors scores 0.
+    """
+    scores = np.zeros(len(candidate_vectors))
+    total_weight = float(weights.sum())
+    if total_weight == 0 or len(requirement_vectors) == 0:
+        return scores
+
+    present = [i for i, v in enumerate(candidate_vectors) if len(v)]
+    if not present:
+        return scores
+
+    blocks = [np.asarray(candidate_vectors[i], dtype=np.float32) for i in present]
+    offsets = np.cumsum([0] + [len(b) for b in blocks[:-1]])
+    similarity = np.asarray(requirement_vectors, dtype=np.float32) @ np.vstack(blocks).T  # (requirements, rows)
+    best = np.maximum.reduceat(similarity, offsets, axis=1)  # (requirements, candidates)
+    normalized = np.clip((best - floor) / (ceiling - floor), 0.0, 1.0)
+    scores[present] = np.minimum(100.0, weights @ normalized / total_weight * 100)
+    return scores
+
+
+def score_candidates_lexically(
+    requirements: list[str],
+    weights: np.ndarray,
+    candidate_terms: list[list[dict]],
+    corpus: CorpusStats | None = None,
+) -> np.ndarray:
+    """Lexical counterpart of `score_candidates_against_requirements`: BM25
+    for every requirement against every chunk of every candidate as one
+    sparse product (against `corpus`'s IDF -- a batch-wide corpus, not each
+    resume's own few chunks), best chunk per requirement per candidate via
+    `np.maximum.reduceat`.
+
+    Raw BM25 is unbounded, so each requirement's best scores are scaled by
+    that requirement's best across all candidates (0-1, batch-relative --
+    fine for round 1, which only ranks within the batch), then combined as a
+    weight-averaged 0-100 score. A candidate with no chunks scores 0.
+    """
+    scores = np.zeros(len(candidate_terms))
+    total_weight = float(weights.sum())
+    present = [i for i, terms in enumerate(candidate_terms) if terms]
+    if total_weight == 0 or not requirements or not present:
+        return scores
+
+    flat = [t for i in present for t in candidate_terms[i]]
+    offsets = np.cumsum([0] + [len(candidate_terms[i]) for i in present[:-1]])
+    best = np.maximum.reduceat(bm25_scores(requirements, flat, corpus), offsets, axis=1)  # (requirements, candidates)
+    per_requirement_max = best.max(axis=1, keepdims=True)
+    normalized = best / np.where(per_requirement_max > 0, per_requirement_max, 1.0)
+    scores[present] = np.minimum(100.0, weights @ normalized / total_weight * 100)
+    return scores
+
+
+def estimate_provisional_scores(
     batch_id: str,
-    filename: str,
+    filenames: list[str],
     jd_skill_weights: dict[str, float],
     floor: float = 0.15,
     ceiling: float = 0.55,
-) -> float:
+    requirement_matrix: RequirementMatrix | None = None,
+) -> np.ndarray:
     """Cheap, local, LLM-free round-1 screen: for each requirement, take the
-    best dense cosine similarity against any resume chunk (no BM25, no
-    reranker, no Groq call) as a continuous match-degree signal.
+    best dense cosine similarity against any resume chunk (no reranker, no
+    Groq call) as a continuous match-degree signal.
 
     `floor`/`ceiling` calibrate raw similarity into a 0-1 range: this
     embedding model's cosine scores for genuinely-unrelated text still sit
@@ -66,38 +234,44 @@ def estimate_provisional_score(
     almost every real resume. Min-max scaling against this model's actual
     range keeps the score continuous.
 
-    Any single requirement's dense score is noisy on its own (BM25 was tried
-    per-requirement too, but with only a handful of chunks as the "corpus" its
-    IDF term degenerates -- a term appearing in most of a resume's own chunks
-    gets penalized, not rewarded, which is backwards for a presence signal).
-    Real JDs carry 15-20+ weighted requirements, so per-requirement noise
-    mostly cancels out in the weighted average -- exactly what round 1 needs:
-    a relative ranking signal across candidates, not a precise per-skill
-    verdict (that's what round 2's LLM review is for).
+    Any single requirement's dense score is noisy on its own. Real JDs carry
+    15-20+ weighted requirements, so per-requirement noise mostly cancels
+    out in the weighted average -- exactly what round 1 needs: a relative
+    ranking signal across candidates, not a precise per-skill verdict
+    (that's what round 2's LLM review is for).
+
+    BM25 was originally dropped here: with one resume's handful of chunks as
+    the corpus its IDF degenerates (a term appearing in most of a resume's
+    own chunks gets penalized, not rewarded). Scored against the batch-wide
+    corpus instead (see `add_to_batch_corpus`), it's a sound presence
+    signal again, so `settings.round1_lexical_weight` of the final score
+    comes from `score_candidates_lexically` -- free, since every chunk's
+    terms were stored at index time.
+
+    Embeds the requirements once (or reuses `requirement_matrix`) and scores
+    every document in one `score_candidates_against_requirements` pass (plus
+    one `score_candidates_lexically` pass). Returns one score per filename,
+    same order. The lexical half is normalized across the documents of this
+    one call, so pass the whole batch together -- scored alone, any
+    document with a nonzero BM25 match would normalize to a perfect 1.0.
     """
-    if not jd_skill_weights:
-        return 0.0
-
-    chunks = fetch_chunks(batch_id, filename)
-    if not chunks:
-        return 0.0
-
-    vectors = np.array([c["vector"] for c in chunks])
-    requirements = list(jd_skill_weights.keys())
-    query_vectors = embed_texts(requirements)
-
-    total_weight = sum(jd_skill_weights.values())
-    if total_weight == 0:
-        return 0.0
-
-    weighted_sum = 0.0
-    for i, requirement in enumerate(requirements):
-        best_similarity = float(np.max(vectors @ query_vectors[i]))
-        normalized = (best_similarity - floor) / (ceiling - floor)
-        normalized = min(1.0, max(0.0, normalized))
-        weighted_sum += jd_skill_weights[requirement] * normalized
-
-    return min(100.0, weighted_sum / total_weight * 100)
+    if not jd_skill_weights or not filenames:
+        return np.zeros(len(filenames))
+
+    matrix = requirement_matrix if requirement_matrix is not None else build_requirement_matrix(jd_skill_weights)
+    stored = fetch_documents(batch_id, filenames)
+    candidate_vectors = [np.array([c["vector"] for c in stored[filename]]) for filename in filenames]
+    dense = score_candidates_against_requirements(matrix.vectors, matrix.weights, candidate_vectors, floor, ceiling)
+    lexical_weight = settings.round1_lexical_weight
+    if lexical_weight <= 0:
+        return dense
+    lexical = score_candidates_lexically(
+        list(matrix.requirements),
+        matrix.weights,
+        [[chunk_terms(c) for c in stored[filename]] for filename in filenames],
+        batch_corpus(batch_id),
+    )
+    return (1 - lexical_weight) * dense + lexical_weight * lexical
 
 
 def estimate_skill_match_score(
@@ -105,10 +279,11 @@ def estimate_skill_match_score(
     resume_skills: dict[str, float],
     floor: float = 0.4,
     ceiling: float = 0.9,
+    requirement_matrix: RequirementMatrix | None = None,
 ) -> float:
     """Round 2's medium-cost narrowing signal: compares the JD's weighted
     skills against the candidate's own extracted skill list (from
-    `extract_weighted_skills_from_resume`) via same-granularity phrase-vs-
+    `extract_weighted_skills_from_resume_async`) via same-granularity phrase-vs-
     phrase cosine similarity -- both sides are short skill phrases, unlike
     round 1's phrase-vs-paragraph-chunk comparison. That granularity match
     makes this dramatically more discriminative: exact/near skill matches
@@ -122,36 +297,139 @@ def estimate_skill_match_score(
     if not jd_skill_weights or not resume_skills:
         return 0.0
 
-    total_weight = sum(jd_skill_weights.values())
-    if total_weight == 0:
-        return 0.0
-
-    jd_requirements = list(jd_skill_weights.keys())
-    jd_vectors = embed_texts(jd_requirements)
+    matrix = requirement_matrix if requirement_matrix is not None else build_requirement_matrix(jd_skill_weights)
     resume_vectors = embed_texts(list(resume_skills.keys()))
+    return float(
+        score_candidates_against_requirements(matrix.vectors, matrix.weights, [resume_vectors], floor, ceiling)[0]
+    )
+
+
+@lru_cache
+def get_evidence_cache() -> LRUCache:
+    # Re-running round 3, or re-scoring a project's candidates after a JD
+    # tweak, asks for the same (document, requirement) evidence again -- only
+    # genuinely new requirements should reach the embedder and cross-encoder.
+    return LRUCache(settings.evidence_cache_max_entries)
+
+
+def evidence_cache_stats() -> dict:
+    return get_evidence_cache().stats()
+
+
+def _chunks_fingerprint(chunks: list[dict]) -> str:
+    """The document's content hash: the `doc_hash` stored with its chunks,
+    or -- for chunks indexed before fingerprints were stored -- the same
+    fingerprint computed from their texts."""
+    stored = {c.get("doc_hash") for c in chunks}
+    if len(stored) == 1 and None not in stored:
+        return stored.pop()
+    ordered = sorted(chunks, key=lambda c: c.get("chunk_index", 0))
+    return document_fingerprint([c["text"] for c in ordered])
+
 
-    weighted_sum = 0.0
-    for i, requirement in enumerate(jd_requirements):
-        best_similarity = float(np.max(resume_vectors @ jd_vectors[i]))
-        normalized = (best_similarity - floor) / (ceiling - floor)
-        normalized = min(1.0, max(0.0, normalized))
-        weighted_sum += jd_skill_weights[requirement] * normalized
+def _evidence_cache_key(doc_hash: str, requirement: str, top_k: int) -> tuple:
+    """Everything final evidence depends on, except batch-wide BM25 IDF
+    (see `batch_corpus`), which is deliberately left out: it only nudges
+    lexical ranks between batches of similar resumes, and keying on it would
+    make every new batch -- exactly the re-run case -- a cold cache."""
+    return (
+        doc_hash,
+        " ".join(requirement.lower().split()),
+        top_k,
+        settings.fusion_candidate_k,
+        settings.rrf_k,
+        settings.adaptive_rerank,
+        settings.rerank_skip_fused_margin,
+        settings.embedding_model,
+        settings.reranker_model,
+    )
 
-    return min(100.0, weighted_sum / total_weight * 100)
+
+def _requirement_aliases(requirement: str) -> list[str]:
+    """Surface forms that count as naming `requirement` outright: the
+    normalized text itself, the text outside any parentheses, a
+    parenthesized acronym of it ("amazon web services (aws)" -> "aws",
+    "amazon web services"), and the initialism of a requirement of three or
+    more words ("natural language processing" -> "nlp").
+
+    An alias hit skips the cross-encoder, so these stay conservative:
+    two-letter initialisms collide with everyday resume words ("computer
+    vision" -> "cv", the resume itself; "customer service" -> "cs"), and a
+    parenthesized qualifier isn't a name for the skill ("python (3+ years)")
+    -- only a single token spelling the outer text's initials is."""
+    normalized = " ".join(tokenize(requirement))
+    aliases = {normalized}
+    outer = " ".join(tokenize(re.sub(r"\([^)]*\)", " ", requirement)))
+    aliases.add(outer)
+    words = outer.split()
+    initials = "".join(word[0] for word in words)
+    for inner in re.findall(r"\(([^)]*)\)", requirement):
+        inner_tokens = tokenize(inner)
+        if len(words) >= 2 and inner_tokens == [initials]:
+            aliases.add(initials)
+    if len(words) >= 3:
+        aliases.add(initials)
+    # Single-character forms ("r", or "c" left over from tokenizing "c++")
+    # match far too much by accident -- those requirements always rerank.
+    return [alias for alias in aliases if len(alias) >= 2]
+
+
+def _rerank_skip_decision(
+    requirement: str, candidate_texts: list[str], fused_scores: np.ndarray, top_k: int
+) -> tuple[str, list[str]] | None:
+    """Returns (reason, evidence) when the cross-encoder can't meaningfully
+    change the outcome for this requirement, else None:
+
+      - "few_candidates": no more fused candidates than evidence slots --
+        every one of them is returned either way.
+      - "exact_hit": some candidates name the requirement verbatim (or by
+        an alias) -- typical of skill-list resumes. Those lead, in fused
+        order, and fused order fills any remaining slots.
+      - "fused_margin": fused rank 1 leads rank `top_k` by at least
+        `settings.rerank_skip_fused_margin` -- fusion is already decisive.
+    """
+    if len(candidate_texts) <= top_k:
+        return "few_candidates", list(candidate_texts)
+
+    # Matched on token-normalized text with token boundaries, so "ml" never
+    # hits inside "html" and punctuation/casing differences don't matter.
+    aliases = [f" {alias} " for alias in _requirement_aliases(requirement)]
+    hits = [text for text in candidate_texts if any(alias in f" {' '.join(tokenize(text))} " for alias in aliases)]
+    if hits:
+        rest = [text for text in candidate_texts if text not in hits]
+        return "exact_hit", (hits + rest)[:top_k]
+
+    margin = settings.rerank_skip_fused_margin
+    if margin > 0 and fused_scores[0] - fused_scores[top_k - 1] >= margin:
+        return "fused_margin", list(candidate_texts[:top_k])
+    return None
 
 
 def retrieve_evidence(
-    batch_id: str, filename: str, requirements: list[str], top_k: int | None = None
+    batch_id: str,
+    filename: str,
+    requirements: list[str],
+    top_k: int | None = None,
+    requirement_matrix: RequirementMatrix | None = None,
+    chunks: list[dict] | None = None,
 ) -> dict[str, list[str]]:
     """For each requirement, fuse BM25 + dense-similarity rankings over the
     document's stored chunks, then rerank the fused candidates with a
-    cross-encoder to pick the final evidence snippets.
+    cross-encoder to pick the final evidence snippets -- unless fusion is
+    already decisive for that requirement (see `_rerank_skip_decision`;
+    `settings.adaptive_rerank` turns this off).
+
+    `requirement_matrix` supplies precomputed requirement embeddings (one
+    matrix per recruiter pipeline) instead of embedding `requirements` here.
+    `chunks` lets a caller that already bulk-fetched this document (round 3,
+    via `fetch_documents`) skip the per-document read.
     """
     logger = get_logger()
     top_k = top_k or settings.evidence_top_k
     empty = {req: [] for req in requirements}
 
-    chunks = fetch_chunks(batch_id, filename)
+    if chunks is None:
+        chunks = fetch_chunks(batch_id, filename)
     logger.debug(
         "retrieve_evidence filename=%s chunk_count=%d requirements=%r",
         filename,
@@ -163,41 +441,100 @@ def retrieve_evidence(
             "retrieve_evidence filename=%s chunk_index=%s tokens=%r text=%r",
             filename,
             c.get("chunk_index"),
-            _tokenize(c["text"]),
+            tokenize(c["text"]),
             c["text"],
         )
     if not chunks or not requirements:
         return empty
 
+    # Requirements whose final evidence for this exact document (and these
+    # retrieval settings) is already known skip embedding, fusion and rerank.
+    cache = get_evidence_cache()
+    doc_hash = _chunks_fingerprint(chunks)
+    cache_keys = {req: _evidence_cache_key(doc_hash, req, top_k) for req in requirements}
+    evidence_map: dict[str, list[str]] = {}
+    for requirement in requirements:
+        cached = cache.get(cache_keys[requirement])
+        if cached is not None:
+            evidence_map[requirement] = list(cached)
+    all_requirements = requirements
+    requirements = [req for req in dict.fromkeys(requirements) if req not in evidence_map]
+    logger.debug(
+        "retrieve_evidence filename=%s doc_hash=%s evidence_cache_hits=%d misses=%d",
+        filename,
+        doc_hash[:12],
+        len(all_requirements) - len(requirements),
+        len(requirements),
+    )
+    if not requirements:
+        return {requirement: evidence_map[requirement] for requirement in all_requirements}
+
     texts = [c["text"] for c in chunks]
     vectors = np.array([c["vector"] for c in chunks])
-    bm25 = BM25Okapi([_tokenize(t) for t in texts])
-    query_vectors = embed_texts(requirements)
+    query_vectors = (
+        requirement_matrix.vectors_for(requirements) if requirement_matrix is not None else embed_texts(requirements)
+    )
+    # Both signals for every requirement at once: one dense matmul, and one
+    # sparse BM25 product over the term frequencies stored at index time
+    # (no per-call re-tokenizing of chunks or BM25Okapi rebuild), with IDF
+    # from the batch-wide corpus when this process indexed the batch.
+    dense_matrix = query_vectors @ vectors.T
+    bm25_matrix = bm25_scores(requirements, [chunk_terms(c) for c in chunks], batch_corpus(batch_id))
 
-    evidence_map: dict[str, list[str]] = {}
-    for i, requirement in enumerate(requirements):
-        dense_scores = vectors @ query_vectors[i]
-        bm25_scores = np.array(bm25.get_scores(_tokenize(requirement)))
+    fused, top_indices = reciprocal_rank_fusion(dense_matrix, bm25_matrix, settings.rrf_k, settings.fusion_candidate_k)
 
-        fused = (
-            1.0 / (settings.rrf_k + _ranks_from_scores(dense_scores) + 1)
-            + 1.0 / (settings.rrf_k + _ranks_from_scores(bm25_scores) + 1)
-        )
-        candidate_idx = np.argsort(-fused)[: settings.fusion_candidate_k]
-        candidate_texts = [texts[idx] for idx in candidate_idx]
+    candidate_texts_per_requirement: list[list[str]] = []
+    for i, requirement in enumerate(requirements):
+        candidate_texts = [texts[idx] for idx in top_indices[i]]
+        candidate_texts_per_requirement.append(candidate_texts)
 
         logger.debug(
             "retrieve_evidence filename=%s requirement=%r tokenized_query=%r "
             "bm25_scores=%r dense_scores=%r fusion_candidates=%r",
             filename,
             requirement,
-            _tokenize(requirement),
-            bm25_scores.tolist(),
-            dense_scores.tolist(),
+            tokenize(requirement),
+            bm25_matrix[i].tolist(),
+            dense_matrix[i].tolist(),
             candidate_texts,
         )
 
-        rerank_scores = rerank(requirement, candidate_texts)
+    # Decide per requirement whether the cross-encoder would actually change
+    # anything; only the rest go through it.
+    to_rerank: list[int] = []
+    for i, (requirement, candidate_texts) in enumerate(zip(requirements, candidate_texts_per_requirement)):
+        decision = None
+        if settings.adaptive_rerank:
+            decision = _rerank_skip_decision(requirement, candidate_texts, fused[i][top_indices[i]], top_k)
+        if decision is None:
+            to_rerank.append(i)
+            continue
+        reason, evidence = decision
+        evidence_map[requirement] = evidence
+        logger.debug(
+            "retrieve_evidence filename=%s requirement=%r rerank=skipped reason=%s final_evidence=%r",
+            filename,
+            requirement,
+            reason,
+            evidence,
+        )
+    logger.info(
+        "retrieve_evidence filename=%s requirements=%d reranked=%d skipped=%d",
+        filename,
+        len(requirements),
+        len(to_rerank),
+        len(requirements) - len(to_rerank),
+    )
+
+    # Every remaining requirement's fused candidates go through the
+    # cross-encoder as one flattened batch -- a single GPU round trip for the
+    # whole candidate.
+    rerank_scores_per_requirement = rerank_many(
+        [(requirements[i], candidate_texts_per_requirement[i]) for i in to_rerank]
+    )
+
+    for i, rerank_scores in zip(to_rerank, rerank_scores_per_requirement):
+        requirement, candidate_texts = requirements[i], candidate_texts_per_requirement[i]
         ranked = sorted(zip(candidate_texts, rerank_scores), key=lambda pair: pair[1], reverse=True)
         evidence_map[requirement] = [snippet for snippet, _ in ranked[:top_k]]
 
@@ -209,7 +546,9 @@ def retrieve_evidence(
             evidence_map[requirement],
         )
 
-    return evidence_map
+    for requirement in requirements:
+        cache.put(cache_keys[requirement], tuple(evidence_map[requirement]))
+    return {requirement: evidence_map[requirement] for requirement in all_requirements}
 
 
 def _requirement_section(requirement: str, weight: float, evidence_map: dict[str, list[str]]) -> str:
@@ -306,8 +645,8 @@ def _parse_plaintext_verdicts(raw: str) -> list[dict]:
     return parsed
 
 
-def _call_structured_groq(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
-    return call_structured(system=system, user=user, schema=schema, model=model)
+async def _call_structured_groq(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
+    return await call_structured_async(system=system, user=user, schema=schema, model=model)
 
 
 def _resolve_schema_refs(schema, defs: dict):
@@ -341,6 +680,20 @@ def _strip_unsupported_schema_keys(schema):
 
 _gemini_client: genai.Client | None = None
 
+# Neither the Gemini nor the Ollama call sets a completion cap, so their
+# admission estimates reserve this much for the response; the real usage
+# each response reports is settled afterwards.
+_RUBRIC_COMPLETION_TOKEN_ESTIMATE = 1024
+
+
+def _estimate_request_tokens(model: str, system: str, user: str, tool: object) -> int:
+    return (
+        estimate_tokens(system, model)
+        + estimate_tokens(user, model)
+        + estimate_tokens(str(tool), model)
+        + _RUBRIC_COMPLETION_TOKEN_ESTIMATE
+    )
+
 
 def _get_gemini_client() -> genai.Client:
     global _gemini_client
@@ -349,7 +702,7 @@ def _get_gemini_client() -> genai.Client:
     return _gemini_client
 
 
-def _call_structured_gemini(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
+async def _call_structured_gemini(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
     raw_schema = schema.model_json_schema()
     resolved_schema = _strip_unsupported_schema_keys(_resolve_schema_refs(raw_schema, raw_schema.get("$defs", {})))
     tool_name = f"emit_{schema.__name__.lower()}"
@@ -370,7 +723,9 @@ def _call_structured_gemini(model: str, system: str, user: str, schema: type[Bas
             function_calling_config=genai_types.FunctionCallingConfig(mode="ANY", allowed_function_names=[tool_name])
         ),
     )
-    response = _get_gemini_client().models.generate_content(model=model, contents=user, config=config)
+    async with admitted("gemini", model, _estimate_request_tokens(model, system, user, resolved_schema)) as usage:
+        response = await _get_gemini_client().aio.models.generate_content(model=model, contents=user, config=config)
+        usage.report(getattr(response.usage_metadata, "total_token_count", None))
     parts = response.candidates[0].content.parts
     function_call = next((p.function_call for p in parts if p.function_call), None)
     if function_call is None:
@@ -378,7 +733,15 @@ def _call_structured_gemini(model: str, system: str, user: str, schema: type[Bas
     return schema.model_validate(dict(function_call.args))
 
 
-def _call_structured_ollama(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
+@lru_cache
+def get_ollama_client() -> httpx.AsyncClient:
+    # One keep-alive pool for every Ollama call (a fresh connection per call
+    # used to cost a TCP handshake each time). Used only on the LLM loop --
+    # see app/core/llm_loop.py.
+    return httpx.AsyncClient(base_url="http://127.0.0.1:11434", timeout=90)
+
+
+async def _call_structured_ollama(model: str, system: str, user: str, schema: type[BaseModel]) -> BaseModel:
     tool_name = f"emit_{schema.__name__.lower()}"
     tool = {
         "type": "function",
@@ -388,22 +751,23 @@ def _call_structured_ollama(model: str, system: str, user: str, schema: type[Bas
             "parameters": schema.model_json_schema(),
         },
     }
-    response = requests.post(
-        "http://127.0.0.1:11434/api/chat",
-        json={
-            "model": model,
-            "messages": [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            "tools": [tool],
-            "options": {"temperature": 0.0},
-            "stream": False,
-        },
-        timeout=90,
-    )
-    response.raise_for_status()
-    data = response.json()
+    async with admitted("ollama", model, _estimate_request_tokens(model, system, user, tool)) as usage:
+        response = await get_ollama_client().post(
+            "/api/chat",
+            json={
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                "tools": [tool],
+                "options": {"temperature": 0.0},
+                "stream": False,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage.report(data.get("prompt_eval_count", 0) + data.get("eval_count", 0))
     if "error" in data:
         # Ollama Cloud's exact error taxonomy for rate/quota limits on the free
         # tier isn't fully characterized yet -- treat any error response here
@@ -427,7 +791,7 @@ def _build_rubric_toolcall_prompt(sections: list[str], requirement_count: int) -
     )
 
 
-def _evaluate_rubric_batch_toolcall(
+async def _evaluate_rubric_batch_toolcall(
     call_fn: Callable[[str, str, str, type[BaseModel]], BaseModel],
     model: str,
     batch: list[tuple[str, float]],
@@ -442,7 +806,7 @@ def _evaluate_rubric_batch_toolcall(
         [req for req, _ in batch],
         user_prompt,
     )
-    result: RubricResultCore = call_fn(model, _RUBRIC_SYSTEM_PROMPT, user_prompt, RubricResultCore)
+    result: RubricResultCore = await call_fn(model, _RUBRIC_SYSTEM_PROMPT, user_prompt, RubricResultCore)
     logger.debug(
         "_evaluate_rubric_batch_toolcall model=%s raw_model_verdicts=%r",
         model,
@@ -498,30 +862,89 @@ def _mark_rubric_tier_exhausted(tier_index: int, provider: str, model: str, erro
     )
 
 
-def _evaluate_rubric_batch_tiered(
-    batch: list[tuple[str, float]], sections: list[str], requirement_count: int, logger
-) -> list[RequirementVerdict]:
-    tiers = [
+def _rubric_tiers() -> list[tuple[str, str, Callable]]:
+    return [
         ("ollama", settings.rubric_ollama_model, _call_structured_ollama),
         ("gemini", settings.rubric_gemini_model, _call_structured_gemini),
         ("groq", settings.rubric_check_fallback_model, _call_structured_groq),
     ]
+
+
+def _reserve_rubric_tier(model: str | None) -> int | None:
+    """Non-blocking: takes a slot on the first tier (in preference order)
+    that's available today and has capacity right now, and returns its
+    index -- or None if every tier is busy. "Capacity" covers both the
+    provider's concurrency cap and the tier model's RPM/TPM/RPD budget, so a
+    batch goes to a tier that can start now rather than queue behind a
+    spent quota. An explicit `model` override always runs on Groq, so only
+    Groq's limiter applies."""
+    if model is not None:
+        return 0 if get_provider_limiter("groq").try_acquire(model) else None
+    tiers = _rubric_tiers()
+    for tier_index, (provider, tier_model, _) in enumerate(tiers):
+        if tier_index != len(tiers) - 1 and not _rubric_tier_available(tier_index):
+            continue
+        if get_provider_limiter(provider).try_acquire(tier_model):
+            return tier_index
+    return None
+
+
+def _rubric_tier_model(model: str | None, tier_index: int) -> str:
+    """The model a batch dispatched on `tier_index` runs on."""
+    return model if model is not None else _rubric_tiers()[tier_index][1]
+
+
+def _rubric_tier_key(model: str | None, tier_index: int) -> str:
+    """The "provider/model" a batch dispatched on `tier_index` runs on -- the
+    key its learned batch limit is kept under (see
+    app/services/rubric_batcher.py)."""
+    provider = "groq" if model is not None else _rubric_tiers()[tier_index][0]
+    return f"{provider}/{_rubric_tier_model(model, tier_index)}"
+
+
+async def _evaluate_rubric_batch_tiered(
+    batch: list[tuple[str, float]],
+    sections: list[str],
+    requirement_count: int,
+    logger,
+    start_tier: int = 0,
+    reserved: bool = False,
+) -> tuple[list[RequirementVerdict], str]:
+    """Runs the fallback chain from `start_tier` on. With `reserved`, the
+    caller already holds a limiter slot on `start_tier` (see
+    `_reserve_rubric_tier`); any tier fallen through to afterwards waits for
+    its own slot. Returns the verdicts and the key of the tier that actually
+    answered."""
+    tiers = _rubric_tiers()
     last_tier_index = len(tiers) - 1
 
     for tier_index, (provider, tier_model, call_fn) in enumerate(tiers):
+        if tier_index < start_tier:
+            continue
+        held = reserved and tier_index == start_tier
         if tier_index != last_tier_index and not _rubric_tier_available(tier_index):
+            if held:
+                get_provider_limiter(provider).release()
             continue
+        limiter = get_provider_limiter(provider)
+        if not held:
+            await limiter.acquire()
         try:
-            return _evaluate_rubric_batch_toolcall(call_fn, tier_model, batch, sections, requirement_count, logger)
+            verdicts = await _evaluate_rubric_batch_toolcall(
+                call_fn, tier_model, batch, sections, requirement_count, logger
+            )
+            return verdicts, _rubric_tier_key(None, tier_index)
         except Exception as e:
             if tier_index == last_tier_index:
                 raise
             _mark_rubric_tier_exhausted(tier_index, provider, tier_model, e, logger)
+        finally:
+            limiter.release()
 
     raise RuntimeError("_evaluate_rubric_batch_tiered: no tier available")  # unreachable -- last tier always raises
 
 
-def _evaluate_rubric_batch_plaintext(
+async def _evaluate_rubric_batch_plaintext(
     model: str, batch: list[tuple[str, float]], sections: list[str], requirement_count: int, logger
 ) -> list[RequirementVerdict]:
     user_prompt = (
@@ -544,7 +967,7 @@ def _evaluate_rubric_batch_plaintext(
         [req for req, _ in batch],
         user_prompt,
     )
-    raw = call_llm(
+    raw = await call_llm_async(
         system=_RUBRIC_SYSTEM_PROMPT,
         user=user_prompt,
         model=model,
@@ -557,25 +980,46 @@ def _evaluate_rubric_batch_plaintext(
     return [RequirementVerdict(**item, suggested_certification=None) for item in parsed]
 
 
-def _evaluate_rubric_batch(
-    batch: list[tuple[str, float]], evidence_map: dict[str, list[str]], model: str | None
+async def _evaluate_rubric_batch(
+    batch: list[tuple[str, float]],
+    evidence_map: dict[str, list[str]],
+    model: str | None,
+    start_tier: int = 0,
+    reserved: bool = False,
+    batch_size: int | None = None,
 ) -> list[RequirementVerdict]:
     # No explicit `model` -- the normal production path -- runs the tiered
     # Ollama/Gemini/Groq fallback chain. An explicit override (used by test
     # scripts to force a specific model) bypasses the chain entirely and
     # calls that one model directly, via whichever pipeline shape it needs.
+    # `start_tier`/`reserved` come from evaluate_rubric's dispatcher (see
+    # `_reserve_rubric_tier`); called without them, this waits for a slot.
+    # `batch_size` is the starting size whose learned limit (on `start_tier`)
+    # sized this batch.
     logger = get_logger()
     sections = [_requirement_section(requirement, weight, evidence_map) for requirement, weight in batch]
     requirement_count = len(batch)
 
     if model is None:
-        full_verdicts = _evaluate_rubric_batch_tiered(batch, sections, requirement_count, logger)
-    elif model in _PLAINTEXT_MODELS:
-        full_verdicts = _evaluate_rubric_batch_plaintext(model, batch, sections, requirement_count, logger)
-    else:
-        full_verdicts = _evaluate_rubric_batch_toolcall(
-            _call_structured_groq, model, batch, sections, requirement_count, logger
+        full_verdicts, tier_key = await _evaluate_rubric_batch_tiered(
+            batch, sections, requirement_count, logger, start_tier=start_tier, reserved=reserved
         )
+    else:
+        tier_key = _rubric_tier_key(model, 0)
+        limiter = get_provider_limiter("groq")
+        if not reserved:
+            await limiter.acquire()
+        try:
+            if model in _PLAINTEXT_MODELS:
+                full_verdicts = await _evaluate_rubric_batch_plaintext(
+                    model, batch, sections, requirement_count, logger
+                )
+            else:
+                full_verdicts = await _evaluate_rubric_batch_toolcall(
+                    _call_structured_groq, model, batch, sections, requirement_count, logger
+                )
+        finally:
+            limiter.release()
 
     # An unsatisfied requirement citing evidence is self-contradictory (if the
     # evidence actually proved it, satisfied should be True) -- some models,
@@ -588,14 +1032,27 @@ def _evaluate_rubric_batch(
             v.evidence = []
 
     reconciled = _reconcile_batch_verdicts(batch, full_verdicts)
+    backfilled = sum(1 for v in reconciled if v.justification == _UNEVALUATED_JUSTIFICATION)
+    # Only the tier whose limit sized the batch learns from it. A batch that
+    # fell through to another tier was sized for a different model -- its
+    # outcome says nothing about either tier's limit.
+    if batch_size and tier_key == _rubric_tier_key(model, start_tier):
+        record_batch_outcome(tier_key, batch_size, len(batch), backfilled)
     logger.debug(
-        "_evaluate_rubric_batch batch=%r reconciled_verdicts=%r",
+        "_evaluate_rubric_batch tier=%s batch=%r backfilled=%d reconciled_verdicts=%r",
+        tier_key,
         [req for req, _ in batch],
+        backfilled,
         [v.model_dump() for v in reconciled],
     )
     return reconciled
 
 
+# Backfilled by `_reconcile_batch_verdicts` when the model dropped a
+# requirement -- a failure, not an answer, so never memoized.
+_UNEVALUATED_JUSTIFICATION = "Could not be reliably evaluated for this candidate."
+
+
 def _reconcile_batch_verdicts(
     batch: list[tuple[str, float]], verdicts: list[RequirementVerdict]
 ) -> list[RequirementVerdict]:
@@ -627,7 +1084,7 @@ def _reconcile_batch_verdicts(
                 weight=weight,
                 satisfied=False,
                 confidence=0.0,
-                justification="Could not be reliably evaluated for this candidate.",
+                justification=_UNEVALUATED_JUSTIFICATION,
                 evidence=[],
                 suggested_certification=None,
             )
@@ -642,9 +1099,10 @@ _CERTIFICATION_SYSTEM = (
 )
 
 
-def _suggest_certifications(requirements: list[str], model: str | None) -> dict[str, str | None]:
-    """One follow-up call covering every unsatisfied requirement from a full
-    rubric evaluation -- decoupled from the batch-scoring call entirely so a
+async def _suggest_certifications(requirements: list[str], model: str | None) -> dict[str, str | None]:
+    """One follow-up call covering a set of unsatisfied requirements (one
+    rubric batch's, or the whole rubric's -- see `_evaluate_rubric`) --
+    decoupled from the batch-scoring call entirely so a
     certification guess can never bleed into (or get bled into by) the
     actual satisfied/evidence verdict. Reconciled the same way batch
     verdicts are: only keep suggestions matching a requested skill, backfill
@@ -668,7 +1126,7 @@ def _suggest_certifications(requirements: list[str], model: str | None) -> dict[
 
     logger.debug("_suggest_certifications requirements=%r prompt=%r", requirements, user_prompt)
 
-    result: CertificationSuggestionList = call_structured(
+    result: CertificationSuggestionList = await call_structured_async(
         system=_CERTIFICATION_SYSTEM,
         user=user_prompt,
         schema=CertificationSuggestionList,
@@ -692,69 +1150,225 @@ def _suggest_certifications(requirements: list[str], model: str | None) -> dict[
     return final_map
 
 
-def evaluate_rubric(
-    evidence_map: dict[str, list[str]],
-    jd_skill_weights: dict[str, float],
-    model: str | None = None,
-    on_activity: Callable[[str], None] | None = None,
-    on_verdict: Callable[[RequirementVerdict], None] | None = None,
-    batch_size: int | None = None,
-    should_stop: Callable[[], bool] | None = None,
-) -> RubricResult:
-    """Judges every requirement against ONLY its cited evidence, batching
-    requirements across several structured LLM calls so a single request
-    never risks exceeding a smaller model's per-request token ceiling.
+def _stopped_verdict(requirement: str, weight: float) -> RequirementVerdict:
+    return RequirementVerdict(
+        requirement=requirement,
+        weight=weight,
+        satisfied=False,
+        confidence=0.0,
+        justification="Stopped before this could be evaluated.",
+        evidence=[],
+        suggested_certification=None,
+    )
 
-    `on_activity`/`on_verdict` fire per batch (`batch_size`, defaulting to
-    `settings.rubric_batch_size` -- recruiter mode passes its own larger
-    value), so the caller can stream "checking X now" and each resolved
-    verdict live instead of only after the whole rubric evaluation finishes.
 
-    `should_stop` is checked before each batch -- a batch already sent to
-    Groq can't be interrupted mid-call, but no new batch starts once it's
-    set. Whatever requirements weren't reached get an explicit "stopped"
-    verdict instead of silently vanishing from the result.
+async def _rubric_batch_planner(
+    requirements: list[tuple[str, float]], evidence_map: dict[str, list[str]]
+) -> RubricBatchPlanner:
+    """Each requirement's evidence section (token-counted per tier model as
+    batches are packed) plus pairwise requirement similarity, for
+    `RubricBatchPlanner`'s packing. With `adaptive_rubric_batching` off, a
+    plain fixed-size planner."""
+    if not settings.adaptive_rubric_batching or len(requirements) < 2:
+        return RubricBatchPlanner(requirements)
+    sections = [_requirement_section(requirement, weight, evidence_map) for requirement, weight in requirements]
+    # Requirement phrases recur across every candidate of a JD, so after the
+    # first these are embedding-cache hits.
+    vectors = await asyncio.to_thread(embed_texts, [requirement for requirement, _ in requirements])
+    return RubricBatchPlanner(
+        requirements,
+        sections=sections,
+        count_tokens=estimate_tokens,
+        similarity=vectors @ vectors.T,
+        max_prompt_tokens=settings.rubric_batch_max_prompt_tokens,
+        duplicate_threshold=settings.rubric_duplicate_similarity,
+    )
+
+
+async def _run_rubric_batches(
+    planner: RubricBatchPlanner,
+    batch_size: int,
+    evidence_map: dict[str, list[str]],
+    model: str | None,
+    model_id: str,
+    cache_keys: dict[str, str],
+    on_activity: Callable[[str], None] | None,
+    on_verdict: Callable[[RequirementVerdict], None] | None,
+    should_stop: Callable[[], bool] | None,
+    on_batch: Callable[[list[RequirementVerdict]], None] | None = None,
+) -> list[RequirementVerdict]:
+    """Concurrent batch executor. Tiers 1-2 (Ollama Cloud, Gemini) have
+    quotas independent of Groq, so instead of one batch at a time, each
+    ready batch is dispatched to whichever tier has capacity right now (per
+    the process-wide provider limiters in app/core/rate_limit.py), up to
+    `settings.rubric_max_parallel_batches` in flight -- a rubric finishes in
+    roughly the time of its slowest batch rather than the sum of all. Each
+    batch is a task on the LLM loop, so batches in flight hold no threads.
+
+    A batch is formed only once its tier is reserved, so it's sized for
+    that tier: `planner` packs it (see RubricBatchPlanner) up to the tier's
+    learned requirements-per-batch limit, which starts at `batch_size`.
+
+    The sequential contract is kept: `on_verdict` fires in batch order (a
+    batch that finishes early is held until every batch before it has been
+    emitted), `should_stop` is checked before dispatching each batch (in-
+    flight batches complete; undispatched requirements get "stopped"
+    verdicts), and the returned verdicts are in batch order.
+
+    `on_batch` is the exception to that ordering: it gets each batch's
+    verdicts the moment the batch returns, for follow-up work (certification
+    suggestions) that doesn't care about order and shouldn't wait on a slower
+    batch dispatched earlier.
     """
+    results: dict[int, list[RequirementVerdict]] = {}
+    in_flight: dict[asyncio.Task, int] = {}
+    emitted: list[RequirementVerdict] = []
+    next_dispatch = 0
+    next_emit = 0
+    stopped: list[tuple[str, float]] = []
+
+    async def emit_ready() -> None:
+        nonlocal next_emit
+        while next_emit in results:
+            verdicts = results.pop(next_emit)
+            for verdict in verdicts:
+                if on_verdict:
+                    on_verdict(verdict)
+            emitted.extend(verdicts)
+            await asyncio.to_thread(
+                store_verdicts,
+                model_id,
+                {
+                    cache_keys[v.requirement]: v
+                    for v in verdicts
+                    if v.requirement in cache_keys and v.justification != _UNEVALUATED_JUSTIFICATION
+                },
+            )
+            next_emit += 1
+
+    max_parallel = max(1, settings.rubric_max_parallel_batches)
+    try:
+        while planner.has_pending() or in_flight:
+            for task in [t for t in in_flight if t.done()]:
+                results[in_flight.pop(task)] = task.result()
+                if on_batch:
+                    on_batch(task.result())
+            await emit_ready()
+
+            if planner.has_pending() and should_stop and should_stop():
+                stopped = planner.drain()
+            if planner.has_pending() and len(in_flight) < max_parallel:
+                tier = _reserve_rubric_tier(model)
+                if tier is not None:
+                    limit = get_tier_batch_limit(_rubric_tier_key(model, tier), batch_size)
+                    batch = planner.next_batch(limit.current(), _rubric_tier_model(model, tier))
+                    if on_activity:
+                        on_activity(", ".join(req for req, _ in batch))
+                    task = asyncio.create_task(
+                        _evaluate_rubric_batch(batch, evidence_map, model, tier, True, batch_size)
+                    )
+                    in_flight[task] = next_dispatch
+                    next_dispatch += 1
+                    continue
+
+            if in_flight:
+                await asyncio.wait(in_flight, timeout=0.25, return_when=asyncio.FIRST_COMPLETED)
+            elif planner.has_pending():
+                await wait_for_capacity(0.25)
+    finally:
+        # A batch that raised (every tier failed) aborts the rubric -- but,
+        # as with the thread pool this replaced, its siblings finish first
+        # (and release their limiter slots) rather than run on unobserved.
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+    for requirement, weight in stopped:
+        verdict = _stopped_verdict(requirement, weight)
+        if on_verdict:
+            on_verdict(verdict)
+        emitted.append(verdict)
+    return emitted
+
+
+async def _evaluate_rubric(
+    evidence_map: dict[str, list[str]],
+    jd_skill_weights: dict[str, float],
+    model: str | None,
+    on_activity: Callable[[str], None] | None,
+    on_verdict: Callable[[RequirementVerdict], None] | None,
+    batch_size: int | None,
+    should_stop: Callable[[], bool] | None,
+) -> RubricResult:
     if not jd_skill_weights:
         return RubricResult(verdicts=[])
 
-    requirements = list(jd_skill_weights.items())
+    logger = get_logger()
     batch_size = batch_size or settings.rubric_batch_size
-
-    all_verdicts = []
-    for i in range(0, len(requirements), batch_size):
-        if should_stop and should_stop():
-            for requirement, weight in requirements[i:]:
-                stopped_verdict = RequirementVerdict(
-                    requirement=requirement,
-                    weight=weight,
-                    satisfied=False,
-                    confidence=0.0,
-                    justification="Stopped before this could be evaluated.",
-                    evidence=[],
-                    suggested_certification=None,
-                )
-                if on_verdict:
-                    on_verdict(stopped_verdict)
-                all_verdicts.append(stopped_verdict)
-            break
-
-        batch = requirements[i : i + batch_size]
-        if on_activity:
-            on_activity(", ".join(req for req, _ in batch))
-        verdicts = _evaluate_rubric_batch(batch, evidence_map, model)
-        for verdict in verdicts:
-            if on_verdict:
-                on_verdict(verdict)
-        all_verdicts.extend(verdicts)
-
-    # Certifications are generated in one dedicated follow-up call, never as
-    # part of batch scoring -- see `_suggest_certifications`. Skipped if a
-    # stop was requested meanwhile, same as the rest of the pipeline: nothing
-    # new starts once the user asks to stop.
-    unsatisfied = [v for v in all_verdicts if not v.satisfied]
-    if unsatisfied and not (should_stop and should_stop()):
-        cert_map = _suggest_certifications([v.requirement for v in unsatisfied], model)
+    model_id = rubric_model_id(model)
+    cache_keys = {
+        requirement: verdict_cache_key(requirement, weight, evidence_map.get(requirement, []), model_id)
+        for requirement, weight in jd_skill_weights.items()
+    }
+    cached = await asyncio.to_thread(load_verdicts, list(cache_keys.values()))
+
+    resolved: dict[str, RequirementVerdict] = {}
+    requirements = []
+    for requirement, weight in jd_skill_weights.items():
+        hit = cached.get(cache_keys[requirement])
+        if hit is None:
+            requirements.append((requirement, weight))
+            continue
+        verdict = RequirementVerdict(
+            **{**hit, "requirement": requirement, "weight": weight}, suggested_certification=None
+        )
+        resolved[requirement] = verdict
+        if on_verdict:
+            on_verdict(verdict)
+    logger.info("evaluate_rubric verdict_cache hits=%d misses=%d", len(resolved), len(requirements))
+
+    # Certifications are generated in dedicated follow-up calls, never as
+    # part of batch scoring -- see `_suggest_certifications`. With
+    # `stream_certification_suggestions` each batch's unsatisfied
+    # requirements get their call as soon as that batch returns (cached
+    # verdicts' right away), overlapping the batches still in flight; off,
+    # one call covers everything after the last batch. Either way nothing
+    # new starts once a stop is requested, same as the rest of the pipeline.
+    cert_tasks: list[asyncio.Task] = []
+
+    def suggest_certifications_for(verdicts: list[RequirementVerdict]) -> None:
+        unsatisfied = [v.requirement for v in verdicts if not v.satisfied]
+        if unsatisfied and not (should_stop and should_stop()):
+            cert_tasks.append(asyncio.create_task(_suggest_certifications(unsatisfied, model)))
+
+    streaming = settings.stream_certification_suggestions
+    if streaming:
+        suggest_certifications_for(list(resolved.values()))
+    try:
+        all_verdicts = await _run_rubric_batches(
+            await _rubric_batch_planner(requirements, evidence_map),
+            batch_size,
+            evidence_map,
+            model,
+            model_id,
+            cache_keys,
+            on_activity,
+            on_verdict,
+            should_stop,
+            on_batch=suggest_certifications_for if streaming else None,
+        )
+    except BaseException:
+        # Don't leave suggestion calls running unobserved past a failed rubric.
+        await asyncio.gather(*cert_tasks, return_exceptions=True)
+        raise
+
+    fresh = {v.requirement: v for v in all_verdicts}
+    all_verdicts = [resolved.get(requirement) or fresh[requirement] for requirement in jd_skill_weights]
+
+    if not streaming:
+        suggest_certifications_for(all_verdicts)
+    if cert_tasks:
+        cert_map: dict[str, str | None] = {}
+        for suggestions in await asyncio.gather(*cert_tasks):
+            cert_map.update(suggestions)
         all_verdicts = [
             v.model_copy(update={"suggested_certification": cert_map.get(v.requirement)})
             if not v.satisfied
@@ -765,38 +1379,65 @@ def evaluate_rubric(
     return RubricResult(verdicts=all_verdicts)
 
 
-def match_resume_to_requirements(
-    batch_id: str,
-    filename: str,
-    resume_text: str,
+def evaluate_rubric(
+    evidence_map: dict[str, list[str]],
     jd_skill_weights: dict[str, float],
     model: str | None = None,
-    on_stage: Callable[[str, str], None] | None = None,
     on_activity: Callable[[str], None] | None = None,
     on_verdict: Callable[[RequirementVerdict], None] | None = None,
     batch_size: int | None = None,
-    evidence_top_k: int | None = None,
-    already_indexed: bool = False,
     should_stop: Callable[[], bool] | None = None,
 ) -> RubricResult:
-    """Full pipeline: index -> hybrid retrieve+rerank -> evidence-grounded rubric scoring.
+    """Judges every requirement against ONLY its cited evidence, batching
+    requirements across several structured LLM calls so a single request
+    never risks exceeding a smaller model's per-request token ceiling.
 
-    `batch_size`/`evidence_top_k` let recruiter mode use its own tuned values
-    (larger batches, fewer snippets per requirement) while job-seeker mode
-    keeps using the `settings` defaults by leaving these unset.
+    `on_activity`/`on_verdict` fire per batch (`batch_size`, defaulting to
+    `settings.rubric_batch_size` -- recruiter mode passes its own value --
+    is each tier's starting batch limit; see app/services/rubric_batcher.py
+    for how batches are packed and how the limit adapts), so the caller can
+    stream "checking X now" and each resolved verdict live instead of only
+    after the whole rubric evaluation finishes.
+
+    `should_stop` is checked before each batch -- a batch already sent to
+    Groq can't be interrupted mid-call, but no new batch starts once it's
+    set. Whatever requirements weren't reached get an explicit "stopped"
+    verdict instead of silently vanishing from the result.
 
-    `already_indexed=True` skips re-chunking/re-embedding: recruiter mode's
-    round 1 prescreen already indexed this exact resume under this batch_id,
-    and `upsert_chunks` always mints new point IDs, so indexing twice doesn't
-    just waste embedding compute -- it silently duplicates every chunk in
-    Qdrant, corrupting BM25/RRF fusion and evidence retrieval for that
-    candidate.
+    Batches run concurrently across the provider tiers (see
+    `_run_rubric_batches`), with both contracts above unchanged. All three
+    callbacks are invoked from the LLM loop's thread (app/core/llm_loop.py),
+    so they must be quick and thread-safe -- job_store's setters are.
+
+    Verdicts are memoized per (requirement, weight, evidence set, model) --
+    see app/services/verdict_cache.py. Cached requirements resolve (and fire
+    `on_verdict`) up front; batches are assembled only from the misses, so a
+    retry or re-run of the same resume against the same JD spends no LLM
+    calls on anything already answered. The result keeps JD order.
     """
+    return run_on_llm_loop(
+        _evaluate_rubric(evidence_map, jd_skill_weights, model, on_activity, on_verdict, batch_size, should_stop)
+    )
+
+
+async def _match_resume_to_requirements(
+    batch_id: str,
+    filename: str,
+    jd_skill_weights: dict[str, float],
+    model: str | None,
+    on_stage: Callable[[str, str], None] | None,
+    on_activity: Callable[[str], None] | None,
+    on_verdict: Callable[[RequirementVerdict], None] | None,
+    batch_size: int | None,
+    evidence_top_k: int | None,
+    should_stop: Callable[[], bool] | None,
+    requirement_matrix: RequirementMatrix | None,
+    chunks: list[dict] | None,
+) -> RubricResult:
     logger = get_logger()
     logger.info(
-        "match_resume_to_requirements START filename=%s already_indexed=%s jd_skill_weights=%r",
+        "match_resume_to_requirements START filename=%s jd_skill_weights=%r",
         filename,
-        already_indexed,
         jd_skill_weights,
     )
 
@@ -804,25 +1445,24 @@ def match_resume_to_requirements(
         if on_stage:
             on_stage(stage, state)
 
-    notify("indexing", "running")
-    if not already_indexed:
-        index_document(batch_id, filename, resume_text)
-    notify("indexing", "done")
-
+    # Retrieval is embedding/GPU-bound, not an LLM call -- it runs in a
+    # worker thread so the LLM loop stays free for in-flight calls.
     notify("retrieval", "running")
     requirements = list(jd_skill_weights.keys())
-    evidence_map = retrieve_evidence(batch_id, filename, requirements, top_k=evidence_top_k)
+    evidence_map = await asyncio.to_thread(
+        retrieve_evidence,
+        batch_id,
+        filename,
+        requirements,
+        top_k=evidence_top_k,
+        requirement_matrix=requirement_matrix,
+        chunks=chunks,
+    )
     notify("retrieval", "done")
 
     notify("scoring", "running")
-    result = evaluate_rubric(
-        evidence_map,
-        jd_skill_weights,
-        model=model,
-        on_activity=on_activity,
-        on_verdict=on_verdict,
-        batch_size=batch_size,
-        should_stop=should_stop,
+    result = await _evaluate_rubric(
+        evidence_map, jd_skill_weights, model, on_activity, on_verdict, batch_size, should_stop
     )
     notify("scoring", "done")
     logger.info(
@@ -832,3 +1472,50 @@ def match_resume_to_requirements(
     )
 
     return result
+
+
+async def match_resume_to_requirements_async(
+    batch_id: str,
+    filename: str,
+    jd_skill_weights: dict[str, float],
+    model: str | None = None,
+    on_stage: Callable[[str, str], None] | None = None,
+    on_activity: Callable[[str], None] | None = None,
+    on_verdict: Callable[[RequirementVerdict], None] | None = None,
+    batch_size: int | None = None,
+    evidence_top_k: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    requirement_matrix: RequirementMatrix | None = None,
+    chunks: list[dict] | None = None,
+) -> RubricResult:
+    """Hybrid retrieve+rerank -> evidence-grounded rubric scoring for a
+    document already in the vector store, reporting the "retrieval" and
+    "scoring" stages through `on_stage`.
+
+    Indexing is the caller's step, so it can overlap other work: recruiter
+    round 1 indexes the whole batch up front, and the job seeker indexes its
+    resume while the JD's requirements are still being extracted.
+
+    `batch_size`/`evidence_top_k` let recruiter mode use its own tuned values
+    (larger batches, fewer snippets per requirement) while job-seeker mode
+    keeps using the `settings` defaults by leaving these unset.
+
+    `requirement_matrix`/`chunks` are passed straight through to
+    `retrieve_evidence`.
+    """
+    return await on_llm_loop(
+        _match_resume_to_requirements(
+            batch_id,
+            filename,
+            jd_skill_weights,
+            model,
+            on_stage,
+            on_activity,
+            on_verdict,
+            batch_size,
+            evidence_top_k,
+            should_stop,
+            requirement_matrix,
+            chunks,
+        )
+    )
@@ -1,48 +1,41 @@
 import asyncio
 import math
-import threading
-import time
 from dataclasses import dataclass, field
 from typing import Callable
 from uuid import uuid4
 
 from app.config import settings
 from app.core.app_logging import recruiter_logger, set_current_logger
-from app.models.schemas import CandidateResult, RecruiterAnalysisResponse, RoundCandidateSummary, RoundSummary
-from app.services.contact_extractor import extract_contact_info
+from app.core.vector_store import fetch_documents
+from app.models.schemas import (
+    CandidateResult,
+    ContactInfo,
+    RecruiterAnalysisResponse,
+    RoundCandidateSummary,
+    RoundSummary,
+    RubricResult,
+)
+from app.services.contact_extractor import extract_contact_info_async
 from app.services.degree_extractor import extract_degrees
 from app.services.document_loader import load_document
 from app.services.exp_extractor import extract_experience
 from app.services.matching import calculate_overall_fit_score
 from app.services.rag_matching import (
-    estimate_provisional_score,
+    RequirementMatrix,
+    build_requirement_matrix,
+    estimate_provisional_scores,
     estimate_skill_match_score,
-    index_document,
-    match_resume_to_requirements,
+    index_documents,
+    match_resume_to_requirements_async,
+)
+from app.services.skill_extractor import (
+    extract_weighted_skills_from_jd_async,
+    extract_weighted_skills_from_resume_async,
 )
-from app.services.skill_extractor import extract_weighted_skills_from_jd, extract_weighted_skills_from_resume
+from app.services.stage_scheduler import Stage, run_stages
 
 _DEGREE_RANKING = {"diploma": 1, "associate": 2, "bachelor": 3, "master": 4, "phd": 5}
 
-# Paces round 3's one big rubric-scoring Groq call per candidate to roughly
-# one per recruiter_call_interval_seconds, so each call sees a close-to-fresh
-# TPM window instead of stacking token usage from back-to-back candidates.
-# Round 2's calls are much lighter (single skill-extraction request, no
-# evidence/citation instructions) so they run at their own concurrency
-# instead, relying on call_structured's existing 429 backoff.
-_pacing_lock = threading.Lock()
-_last_call_started_at = 0.0
-
-
-def _wait_for_pacing_slot() -> None:
-    global _last_call_started_at
-    with _pacing_lock:
-        remaining = settings.recruiter_call_interval_seconds - (time.monotonic() - _last_call_started_at)
-        if remaining > 0:
-            time.sleep(remaining)
-        _last_call_started_at = time.monotonic()
-
-
 def _check_eligibility(resume_degree: dict, jd_degree: dict, resume_exp: int, jd_exp: int) -> list[str]:
     reasons = []
     if jd_degree["highest"] and resume_degree["highest"]:
@@ -109,6 +102,10 @@ class PipelineState:
     screened_out_round2: list[CandidateResult] = field(default_factory=list)
     round1_survivors: list[_Candidate] = field(default_factory=list)
     round2_survivors: list[_Candidate] = field(default_factory=list)
+    # The JD's requirements embedded exactly once, in run_round1 -- every
+    # round scores against this frozen matrix instead of re-embedding the
+    # same requirement keys once per candidate.
+    requirement_matrix: RequirementMatrix | None = None
 
 
 def _round1_shortlist_size(num_eligible: int, num_vacancies: int | None) -> int:
@@ -128,18 +125,16 @@ def _round2_shortlist_size(original_eligible_count: int, num_round1_survivors: i
 
 
 def _prescreen_one_sync(
-    batch_id: str,
     storage_key: str,
     filename: str,
     content: bytes,
-    jd_skill_weights: dict[str, float],
     jd_degree: dict,
     jd_exp: int,
 ) -> dict:
-    """Round 1: free, local-only screen -- no Groq calls. Loads the resume,
-    checks hard eligibility (degree/experience), and for eligible candidates
-    indexes it in Qdrant (reused by round 3 later -- never re-indexed) and
-    computes a cheap dense-cosine provisional score.
+    """Round 1, per candidate: free, local-only -- no Groq calls. Loads the
+    resume and checks hard eligibility (degree/experience). Indexing and
+    scoring happen afterwards for every eligible candidate at once (see
+    `_index_and_score_sync`).
     """
     resume_text = load_document(filename, content)
     recruiter_logger.debug("_prescreen_one_sync filename=%s raw_resume_text=%r", filename, resume_text)
@@ -154,22 +149,33 @@ def _prescreen_one_sync(
         recruiter_logger.info("_prescreen_one_sync filename=%s INELIGIBLE reasons=%r", filename, reasons)
         return {"filename": filename, "eligible": False, "reasons": reasons, "experience_years": resume_exp}
 
-    index_document(batch_id, storage_key, resume_text)
-    provisional_score = estimate_provisional_score(batch_id, storage_key, jd_skill_weights)
-    recruiter_logger.info(
-        "_prescreen_one_sync filename=%s provisional_score=%.2f", filename, provisional_score
-    )
-
     return {
         "filename": filename,
         "storage_key": storage_key,
         "eligible": True,
         "resume_text": resume_text,
         "experience_years": resume_exp,
-        "provisional_score": provisional_score,
     }
 
 
+def _index_and_score_sync(
+    batch_id: str,
+    eligible: list[dict],
+    jd_skill_weights: dict[str, float],
+    requirement_matrix: RequirementMatrix,
+) -> list[float]:
+    """Round 1, whole batch: indexes every eligible resume with one bulk
+    upsert (reused by round 3 later -- never re-indexed), then computes every
+    cheap dense-cosine provisional score in one vectorized pass over one bulk
+    fetch. Returns scores in `eligible` order.
+    """
+    index_documents(batch_id, {r["storage_key"]: r["resume_text"] for r in eligible})
+    scores = estimate_provisional_scores(
+        batch_id, [r["storage_key"] for r in eligible], jd_skill_weights, requirement_matrix=requirement_matrix
+    )
+    return [float(score) for score in scores]
+
+
 async def run_round1(
     job_desc_text: str,
     job_role: str,
@@ -177,24 +183,29 @@ async def run_round1(
     num_vacancies: int | None = None,
     on_candidate: Callable[[str, str, float | None, str], None] | None = None,
     should_stop: Callable[[], bool] | None = None,
+    batch_id: str | None = None,
 ) -> tuple[PipelineState, RoundSummary]:
-    """Round 1: cheap, local, LLM-free prescreen of every candidate. Runs at
-    high concurrency since nothing here touches Groq.
+    """Round 1: cheap, local, LLM-free prescreen of every candidate. Loading
+    and eligibility run at high concurrency since nothing here touches Groq;
+    eligible resumes are then indexed and scored together in bulk.
 
     `should_stop` is checked once per candidate, right before starting its
     work -- a stop request can't interrupt a candidate already mid-flight,
     but no new candidate starts once it's set. Anyone skipped this way is
     reported as not-yet-processed (eligible=False) rather than silently
     dropped, so the caller's candidate count always adds up.
+
+    `batch_id` lets the caller own the vector-store batch (and clean it up
+    even if this round fails mid-index); a fresh one is generated if omitted.
     """
     set_current_logger(recruiter_logger)
     recruiter_logger.info("=== run_round1 START job_role=%r resume_count=%d ===", job_role, len(resumes))
 
     jd_degree = extract_degrees(job_desc_text)
     jd_exp = extract_experience(job_desc_text)
-    jd_skill_weights = extract_weighted_skills_from_jd(job_desc_text, job_role)
+    jd_skill_weights = await extract_weighted_skills_from_jd_async(job_desc_text, job_role)
     total_weight = sum(jd_skill_weights.values())
-    batch_id = str(uuid4())
+    batch_id = batch_id or str(uuid4())
     recruiter_logger.debug(
         "run_round1 jd_degree=%r jd_exp=%r jd_skill_weights=%r", jd_degree, jd_exp, jd_skill_weights
     )
@@ -218,6 +229,7 @@ async def run_round1(
         )
         return state, RoundSummary(round=1, label="Free prescreen", candidates=[], advancing_count=0)
 
+    requirement_matrix = await asyncio.to_thread(build_requirement_matrix, jd_skill_weights)
     prescreen_semaphore = asyncio.Semaphore(settings.recruiter_prescreen_concurrency)
 
     async def prescreen_one(index: int, filename: str, content: bytes) -> dict:
@@ -226,9 +238,7 @@ async def run_round1(
             if stopped():
                 return {"filename": filename, "eligible": False, "reasons": ["Stopped before processing."]}
             notify(filename, "running", None, "round1")
-            outcome = await asyncio.to_thread(
-                _prescreen_one_sync, batch_id, storage_key, filename, content, jd_skill_weights, jd_degree, jd_exp
-            )
+            outcome = await asyncio.to_thread(_prescreen_one_sync, storage_key, filename, content, jd_degree, jd_exp)
             if not outcome["eligible"]:
                 notify(filename, "done", 0.0, "done")
             return outcome
@@ -249,6 +259,13 @@ async def run_round1(
         if not r["eligible"]
     ]
     eligible = [r for r in prescreen_results if r["eligible"]]
+    if eligible:
+        scores = await asyncio.to_thread(
+            _index_and_score_sync, batch_id, eligible, jd_skill_weights, requirement_matrix
+        )
+        for r, score in zip(eligible, scores):
+            r["provisional_score"] = score
+            recruiter_logger.info("run_round1 filename=%s provisional_score=%.2f", r["filename"], score)
     eligible.sort(key=lambda r: r["provisional_score"], reverse=True)
 
     shortlist_size = _round1_shortlist_size(len(eligible), num_vacancies)
@@ -305,6 +322,7 @@ async def run_round1(
         ineligible_results=ineligible_results,
         screened_out_round1=screened_out_round1,
         round1_survivors=round1_survivors,
+        requirement_matrix=requirement_matrix,
     )
     summary = RoundSummary(
         round=1, label="Free prescreen", candidates=summary_candidates, advancing_count=len(round1_survivors)
@@ -319,9 +337,15 @@ async def run_round1(
     return state, summary
 
 
-def _skill_match_one_sync(jd_skill_weights: dict[str, float], resume_text: str) -> tuple[dict[str, float], float]:
-    extracted_skills = extract_weighted_skills_from_resume(resume_text)
-    score = estimate_skill_match_score(jd_skill_weights, extracted_skills)
+async def _skill_match_one(
+    jd_skill_weights: dict[str, float], resume_text: str, requirement_matrix: RequirementMatrix | None
+) -> tuple[dict[str, float], float]:
+    # The LLM call is awaited on the LLM loop (no thread held while Groq
+    # answers); only the short embedding step needs a worker thread.
+    extracted_skills = await extract_weighted_skills_from_resume_async(resume_text)
+    score = await asyncio.to_thread(
+        estimate_skill_match_score, jd_skill_weights, extracted_skills, requirement_matrix=requirement_matrix
+    )
     return extracted_skills, score
 
 
@@ -369,8 +393,8 @@ async def run_round2(
             if stopped():
                 return candidate
             notify(candidate.filename, "running", None, "round2")
-            extracted_skills, score = await asyncio.to_thread(
-                _skill_match_one_sync, state.jd_skill_weights, candidate.resume_text
+            extracted_skills, score = await _skill_match_one(
+                state.jd_skill_weights, candidate.resume_text, state.requirement_matrix
             )
             candidate.extracted_skills = extracted_skills
             candidate.skill_match_score = score
@@ -445,7 +469,7 @@ async def run_round2(
     return state, summary
 
 
-def _detailed_one_sync(
+async def _detailed_one(
     batch_id: str,
     storage_key: str,
     filename: str,
@@ -456,22 +480,41 @@ def _detailed_one_sync(
     jd_skill_weights: dict[str, float],
     total_weight: float,
     job_desc_text: str,
+    requirement_matrix: RequirementMatrix | None,
+    chunks: list[dict] | None,
 ) -> CandidateResult:
     """Round 3: the expensive per-requirement LLM verification -- only for
     candidates that survived both prior cuts.
+
+    The rubric, the overall-fit score and contact extraction don't depend on
+    each other, so they run as independent stages (app/services/
+    stage_scheduler.py): the fit score (GPU) and the contact call overlap
+    the rubric instead of queueing behind it, and a candidate takes as long
+    as its rubric rather than the sum of all three.
     """
-    _wait_for_pacing_slot()
-    rubric = match_resume_to_requirements(
-        batch_id,
-        storage_key,
-        resume_text,
-        jd_skill_weights,
-        batch_size=settings.recruiter_rubric_batch_size,
-        evidence_top_k=settings.recruiter_evidence_top_k,
-        already_indexed=True,
+
+    async def score_rubric() -> RubricResult:
+        return await match_resume_to_requirements_async(
+            batch_id,
+            storage_key,
+            jd_skill_weights,
+            batch_size=settings.recruiter_rubric_batch_size,
+            evidence_top_k=settings.recruiter_evidence_top_k,
+            requirement_matrix=requirement_matrix,
+            chunks=chunks,
+        )
+
+    async def extract_contact() -> ContactInfo:
+        return await extract_contact_info_async(resume_text)
+
+    stages = await run_stages(
+        [
+            Stage("rubric", score_rubric),
+            Stage("overall_fit", lambda: calculate_overall_fit_score(resume_text, job_desc_text)),
+            Stage("contact", extract_contact),
+        ]
     )
-    overall_fit_score = calculate_overall_fit_score(resume_text, job_desc_text)
-    contact = extract_contact_info(resume_text)
+    rubric, overall_fit_score, contact = stages["rubric"], stages["overall_fit"], stages["contact"]
 
     satisfied_weight = sum(v.weight for v in rubric.verdicts if v.satisfied)
     normalized_score = (satisfied_weight / total_weight * 100) if total_weight > 0 else 0.0
@@ -501,8 +544,8 @@ async def run_round3(
     should_stop: Callable[[], bool] | None = None,
 ) -> RecruiterAnalysisResponse:
     """Round 3: expensive, evidence-grounded per-requirement LLM review,
-    paced the same way the original single-round design was, run only on
-    round 2's survivors.
+    run only on round 2's survivors, as fast as the shared per-model rate
+    budgets admit its calls.
 
     Same cooperative-stop contract: a candidate `should_stop` catches before
     its detailed review starts is reported at round 2's skill-match score
@@ -521,6 +564,11 @@ async def run_round3(
             on_candidate(filename, state_, score, phase)
 
     detail_semaphore = asyncio.Semaphore(settings.recruiter_concurrency)
+    # Every shortlisted candidate's chunks in one bulk read up front, instead
+    # of one scroll per candidate inside retrieve_evidence.
+    prefetched_chunks = await asyncio.to_thread(
+        fetch_documents, state.batch_id, [c.storage_key for c in state.round2_survivors]
+    )
 
     async def detailed_one(candidate: _Candidate) -> CandidateResult:
         async with detail_semaphore:
@@ -535,8 +583,7 @@ async def run_round3(
                     round_reached=2,
                 )
             notify(candidate.filename, "running", None, "round3")
-            result = await asyncio.to_thread(
-                _detailed_one_sync,
+            result = await _detailed_one(
                 state.batch_id,
                 candidate.storage_key,
                 candidate.filename,
@@ -547,6 +594,8 @@ async def run_round3(
                 state.jd_skill_weights,
                 state.total_weight,
                 state.job_desc_text,
+                state.requirement_matrix,
+                prefetched_chunks.get(candidate.storage_key),
             )
             notify(candidate.filename, "done", result.skill_based_ats_score, "done")
             return result
@@ -0,0 +1,159 @@
+import threading
+from typing import Callable
+
+import numpy as np
+
+from app.config import settings
+
+# AIMD on each tier's requirements-per-batch limit: a batch that comes back
+# complete at the current limit nudges it up; one where the model dropped a
+# requirement (`_reconcile_batch_verdicts` had to backfill it) cuts it well
+# below the size that just failed. Dropped requirements are the measurable
+# symptom of an overloaded batch -- the same pressure that caused the
+# cross-attribution documented next to rubric_batch_size in config.py.
+_INCREASE_PER_CLEAN_BATCH = 0.5
+_DECREASE_FACTOR = 0.7
+_BACKFILL_RATE_SMOOTHING = 0.2
+
+
+class TierBatchLimit:
+    """Learned requirements-per-batch limit for one provider/model, shared
+    by every rubric in the process."""
+
+    def __init__(self, initial: int, ceiling: int):
+        self.ceiling = max(1, ceiling)
+        self._size = float(min(max(1, initial), self.ceiling))
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requirements = 0
+        self.backfilled = 0
+        self.backfill_rate = 0.0
+
+    def current(self) -> int:
+        with self._lock:
+            return max(1, int(self._size))
+
+    def record(self, batch_size: int, backfilled: int) -> None:
+        with self._lock:
+            self.batches += 1
+            self.requirements += batch_size
+            self.backfilled += backfilled
+            rate = backfilled / batch_size if batch_size else 0.0
+            self.backfill_rate += _BACKFILL_RATE_SMOOTHING * (rate - self.backfill_rate)
+            if backfilled:
+                self._size = max(1.0, min(self._size, batch_size) * _DECREASE_FACTOR)
+            elif batch_size >= int(self._size):
+                self._size = min(float(self.ceiling), self._size + _INCREASE_PER_CLEAN_BATCH)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": max(1, int(self._size)),
+                "batches": self.batches,
+                "requirements": self.requirements,
+                "backfilled": self.backfilled,
+                "backfill_rate": round(self.backfill_rate, 4),
+            }
+
+
+# Keyed by (tier, starting size): job-seeker (rubric_batch_size) and
+# recruiter (recruiter_rubric_batch_size, with fewer evidence snippets per
+# requirement) rubrics learn separately, instead of whichever ran first
+# setting the other's starting point and its outcomes moving both.
+_limits: dict[tuple[str, int], TierBatchLimit] = {}
+_limits_lock = threading.Lock()
+
+
+def get_tier_batch_limit(tier_key: str, initial: int) -> TierBatchLimit:
+    with _limits_lock:
+        limit = _limits.get((tier_key, initial))
+        if limit is None:
+            limit = TierBatchLimit(initial, settings.rubric_batch_max_size)
+            _limits[(tier_key, initial)] = limit
+        return limit
+
+
+def record_batch_outcome(tier_key: str, initial: int, batch_size: int, backfilled: int) -> None:
+    get_tier_batch_limit(tier_key, initial).record(batch_size, backfilled)
+
+
+def rubric_batching_stats() -> dict:
+    with _limits_lock:
+        limits = dict(_limits)
+    return {f"{tier_key} (start {initial})": limit.stats() for (tier_key, initial), limit in limits.items()}
+
+
+class RubricBatchPlanner:
+    """Forms rubric batches one at a time, as the dispatcher reserves a tier
+    for each, out of the requirements still pending (in JD order).
+
+    Each batch starts with the oldest pending requirement (so every call
+    makes progress) and then takes later ones while all three hold:
+      * the batch stays under `max_requirements` (the tier's learned limit);
+      * its evidence sections stay under `max_prompt_tokens` -- batches are
+        packed by size, so a requirement with little evidence costs less
+        than one with four long snippets;
+      * it isn't a near-duplicate (embedding cosine >= `duplicate_threshold`)
+        of a requirement already in the batch -- "Power BI" and "Tableau"
+        land in different calls, where neither's evidence can be cited for
+        the other.
+    A requirement skipped for either of the last two reasons stays pending
+    for a later batch.
+
+    Sections are token-counted with `count_tokens(text, model)` for the
+    model each batch is being packed for -- tiers tokenize differently -- and
+    each model's counts are computed once.
+
+    With no `similarity` matrix and no token budget this reduces to the old
+    fixed-size contiguous chunks.
+    """
+
+    def __init__(
+        self,
+        requirements: list[tuple[str, float]],
+        sections: list[str] | None = None,
+        count_tokens: Callable[[str, str | None], int] | None = None,
+        similarity: np.ndarray | None = None,
+        max_prompt_tokens: int = 0,
+        duplicate_threshold: float = 1.0,
+    ):
+        self.requirements = requirements
+        self.sections = sections or [""] * len(requirements)
+        self.count_tokens = count_tokens
+        self.similarity = similarity
+        self.max_prompt_tokens = max_prompt_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self._pending = list(range(len(requirements)))
+        self._section_tokens: dict[str | None, list[int]] = {}
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def _tokens_for(self, model: str | None) -> list[int]:
+        if model not in self._section_tokens:
+            count = self.count_tokens or (lambda text, model: 0)
+            self._section_tokens[model] = [count(section, model) for section in self.sections]
+        return self._section_tokens[model]
+
+    def next_batch(self, max_requirements: int, model: str | None = None) -> list[tuple[str, float]]:
+        section_tokens = self._tokens_for(model)
+        chosen = [self._pending[0]]
+        tokens = section_tokens[chosen[0]]
+        for index in self._pending[1:]:
+            if len(chosen) >= max_requirements:
+                break
+            if self.max_prompt_tokens and tokens + section_tokens[index] > self.max_prompt_tokens:
+                continue
+            if self.similarity is not None and self.similarity[index, chosen].max() >= self.duplicate_threshold:
+                continue
+            chosen.append(index)
+            tokens += section_tokens[index]
+        taken = set(chosen)
+        self._pending = [i for i in self._pending if i not in taken]
+        return [self.requirements[i] for i in chosen]
+
+    def drain(self) -> list[tuple[str, float]]:
+        """Everything never dispatched (a stop was requested), in JD order."""
+        remaining = [self.requirements[i] for i in self._pending]
+        self._pending = []
+        return remaining
@@ -1,4 +1,4 @@
-from app.core.llm import call_structured
+from app.core.llm import call_structured, call_structured_async
 from app.models.schemas import WeightedSkillList
 
 _WEIGHTED_SKILL_SYSTEM = (
@@ -10,24 +10,37 @@ _WEIGHTED_SKILL_SYSTEM = (
 )
 
 
-def extract_weighted_skills_from_jd(jd_text: str, job_role: str, model: str | None = None) -> dict[str, float]:
-    """Extracts a dict of {skill: importance_weight} from a job description."""
-    result: WeightedSkillList = call_structured(
-        system=_WEIGHTED_SKILL_SYSTEM,
-        user=(
+def _jd_skills_request(jd_text: str, job_role: str, model: str | None) -> dict:
+    return {
+        "system": _WEIGHTED_SKILL_SYSTEM,
+        "user": (
             f"Extract all technical skills from the following Job Description and assign importance "
             f"weights based on the job role '{job_role}'. Weights range 0 (least important) to "
             f"1 (most important). Keep multi-word skills together.\n\nJD:\n{jd_text}"
         ),
-        schema=WeightedSkillList,
-        model=model,
-    )
+        "schema": WeightedSkillList,
+        "model": model,
+    }
+
+
+def _jd_skill_weights(result: WeightedSkillList) -> dict[str, float]:
     # .strip() first: the model occasionally emits near-duplicate skill
     # entries that differ only in surrounding whitespace, which would
     # otherwise survive as two distinct dict keys after lowercasing alone.
     return {item.skill.strip().lower(): item.weight for item in result.skills}
 
 
+def extract_weighted_skills_from_jd(jd_text: str, job_role: str, model: str | None = None) -> dict[str, float]:
+    """Extracts a dict of {skill: importance_weight} from a job description."""
+    return _jd_skill_weights(call_structured(**_jd_skills_request(jd_text, job_role, model)))
+
+
+async def extract_weighted_skills_from_jd_async(
+    jd_text: str, job_role: str, model: str | None = None
+) -> dict[str, float]:
+    return _jd_skill_weights(await call_structured_async(**_jd_skills_request(jd_text, job_role, model)))
+
+
 _RESUME_WEIGHTED_SKILL_SYSTEM = (
     "You are an expert technical recruiter. Your task is to extract ONLY technical skills, "
     "tools, technologies, platforms, cloud services, databases, frameworks, and methodologies "
@@ -37,14 +50,14 @@ _RESUME_WEIGHTED_SKILL_SYSTEM = (
 )
 
 
-def extract_weighted_skills_from_resume(resume_text: str, model: str | None = None) -> dict[str, float]:
+async def extract_weighted_skills_from_resume_async(resume_text: str, model: str | None = None) -> dict[str, float]:
     """Extracts a dict of {skill: confidence_weight} from a resume -- round 2's
 
     medium-cost narrowing signal. Unlike `extract_weighted_skills_from_jd`, the
     weight here reflects how strongly the resume backs the skill up (repeated
     mentions, years of use) rather than importance to a role.
     """
-    result: WeightedSkillList = call_structured(
+    result: WeightedSkillList = await call_structured_async(
         system=_RESUME_WEIGHTED_SKILL_SYSTEM,
         user=(
             "Extract all technical skills mentioned in the following resume, and assign each a "
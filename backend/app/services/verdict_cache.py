@@ -0,0 +1,87 @@
+import hashlib
+import json
+
+from app.config import settings
+from app.core.app_logging import get_logger
+from app.models.schemas import RequirementVerdict
+
+
+def rubric_model_id(model: str | None) -> str:
+    """What answered (or would answer) a rubric call. No explicit model means
+    the tiered chain -- keyed on all three tier models, since any of them may
+    be the one that answers."""
+    if model is not None:
+        return model
+    return "tiered:" + "|".join(
+        [settings.rubric_ollama_model, settings.rubric_gemini_model, settings.rubric_check_fallback_model]
+    )
+
+
+def verdict_cache_key(requirement: str, weight: float, evidence: list[str], model_id: str) -> str:
+    """Canonical hash of everything one requirement's rubric verdict depends
+    on: normalized requirement text, its weight rounded to one decimal (the
+    prompt shows it to two; tiny re-weightings shouldn't miss), its evidence
+    snippets in sorted order (retrieval order doesn't change the question),
+    and the model."""
+    canonical = json.dumps(
+        {
+            "requirement": " ".join(requirement.lower().split()),
+            "weight": round(weight, 1),
+            "evidence": sorted(evidence),
+            "model": model_id,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _enabled() -> bool:
+    return settings.rubric_verdict_cache_enabled and bool(settings.database_url)
+
+
+def _session():
+    # Imported lazily: rag_matching (and so this module) must stay importable
+    # without a configured database -- scripts and tests run it standalone.
+    from app.db.session import get_db_session
+
+    return get_db_session()
+
+
+def load_verdicts(cache_keys: list[str]) -> dict[str, dict]:
+    """Best-effort: a database hiccup only means every requirement is a miss
+    -- never a failed rubric evaluation."""
+    if not _enabled() or not cache_keys:
+        return {}
+    from app.db import crud
+
+    db = _session()
+    try:
+        return crud.get_cached_verdicts(db, cache_keys)
+    except Exception:
+        get_logger().warning("verdict cache read failed; evaluating uncached", exc_info=True)
+        return {}
+    finally:
+        db.close()
+
+
+def store_verdicts(model_id: str, verdicts: dict[str, RequirementVerdict]) -> None:
+    if not _enabled() or not verdicts:
+        return
+    from app.db import crud
+
+    db = _session()
+    try:
+        crud.save_cached_verdicts(
+            db,
+            model_id,
+            {
+                key: v.model_dump(mode="json", exclude={"suggested_certification"})
+                for key, v in verdicts.items()
+            },
+        )
+    except Exception:
+        db.rollback()
+        get_logger().warning("verdict cache write failed", exc_info=True)
+    finally:
+        db.close()